@@ -1,7 +1,13 @@
+import numpy as np
 import pandas as pd
+import glob
+import heapq
 import random
 import math
+import os
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import Dict,List
 
 class Task:
@@ -15,6 +21,12 @@ class Task:
         self.schedulable = True
         # Initialize it as -1 since this will be calculated by the simulator
         self.wcrt = -1
+        # Simulation statistics, also counted after the task has missed a deadline
+        self.max_response_time = -1
+        self.completed_jobs = 0
+        self.missed_deadlines = 0
+        # Execution time sampler used by the simulator, uniform sampling is used if it isn't set
+        self.sampler = None
 
 class Job:
     def __init__(self, task_id: str, deadline: int, release_time: int):
@@ -24,6 +36,166 @@ class Job:
         self.exec_time = gen_random_comp_time(self)
 
 
+"""
+Distribution of the execution times of the jobs of the VSS. Execution times are always multiples of the time
+unit above the BCET of the task:
+-uniform: every value between BCET and WCET is equally likely (the original behaviour of the VSS)
+-normal: normal distribution centered between BCET and WCET, with a standard deviation of std_ratio times their
+ difference, truncated to [BCET, WCET]
+-empirical: histogram of measured execution times per task, loaded from histogram_file, a csv file with the
+ columns Task, ExecTime and (optionally) Count. create_sampler raises a ValueError if a measured value of the
+ task isn't one of its valid execution times
+With block_size > 0, the samples of each task are pre-generated with NumPy in blocks of that size. The NumPy
+generators are seeded from the random module, so runs stay reproducible with random.seed, but the sequence of
+execution times differs from the one drawn without blocks.
+"""
+class ExecTimeDistribution:
+    KINDS = ("uniform", "normal", "empirical")
+
+    def __init__(self, kind: str = "uniform", histogram_file: str = None, block_size: int = 0, std_ratio: float = 1/6):
+        if kind not in self.KINDS:
+            raise ValueError("Unknown execution time distribution '" + kind + "', expected one of " + ", ".join(self.KINDS))
+
+        if kind == "empirical" and histogram_file is None:
+            raise ValueError("The empirical execution time distribution needs a histogram file")
+
+        self.kind = kind
+        self.block_size = block_size
+        self.std_ratio = std_ratio
+        self.histograms = load_histograms(histogram_file) if kind == "empirical" else {}
+
+    """
+    Creates the execution time sampler of a task
+    """
+    def create_sampler(self, task: Task, time_unit: float) -> "ExecTimeSampler":
+        histogram = None
+
+        if self.kind == "empirical":
+            histogram = self.histograms.get(task.id)
+
+            if histogram is None:
+                raise ValueError("No measured execution times for task " + str(task.id))
+
+            # Measured values must be valid execution times of the task, like the ones drawn by the other kinds
+            for value in histogram[0]:
+                steps = (value - task.bcet) / time_unit
+
+                if not task.bcet - TICK_TOLERANCE <= value <= task.wcet + TICK_TOLERANCE:
+                    raise ValueError("Measured execution time " + str(value) + " of task " + str(task.id) +
+                                     " is outside [BCET, WCET] = [" + str(task.bcet) + ", " + str(task.wcet) + "]")
+                if abs(steps - round(steps)) > TICK_TOLERANCE:
+                    raise ValueError("Measured execution time " + str(value) + " of task " + str(task.id) +
+                                     " is not a multiple of the time unit " + str(time_unit) + " above the BCET")
+
+        return ExecTimeSampler(task, time_unit, self.kind, histogram, self.block_size, self.std_ratio)
+
+
+"""
+Draws the execution times of the jobs of a task in constant time (logarithmic in the number of histogram bins
+for the empirical distribution), optionally from pre-generated blocks of samples
+"""
+class ExecTimeSampler:
+    def __init__(self, task: Task, time_unit: float, kind: str, histogram: tuple = None, block_size: int = 0,
+                 std_ratio: float = 1/6):
+        self.kind = kind
+        self.bcet = task.bcet
+        self.time_unit = time_unit
+        # Number of multiples of the time unit between BCET and WCET
+        self.steps = int((task.wcet - task.bcet) // time_unit) + 1
+        self.mean = (task.bcet + task.wcet) / 2
+        self.std = (task.wcet - task.bcet) * std_ratio
+        # Measured values and their cumulative counts
+        self.histogram = histogram
+
+        self.block_size = block_size
+        self.block = []
+        self.position = 0
+        self.generator = None
+
+        if block_size > 0:
+            self.generator = np.random.default_rng(random.getrandbits(64))
+
+    def sample(self) -> float:
+        if self.block_size <= 0:
+            return self.draw()
+
+        if self.position == len(self.block):
+            self.block = self.generate_block()
+            self.position = 0
+
+        value = self.block[self.position]
+        self.position += 1
+
+        return value
+
+    """
+    Draws a single execution time with the random module
+    """
+    def draw(self) -> float:
+        if self.kind == "uniform":
+            # Same value, and same random state, as random.choice on the list of every candidate value
+            return self.bcet + random.randrange(self.steps) * self.time_unit
+
+        if self.kind == "normal":
+            if self.std == 0:
+                return self.bcet
+
+            # Rejection sampling of the normal distribution rounded to the time unit grid
+            while True:
+                step = round((random.gauss(self.mean, self.std) - self.bcet) / self.time_unit)
+
+                if 0 <= step < self.steps:
+                    return self.bcet + step * self.time_unit
+
+        values, cumulative_counts = self.histogram
+        return random.choices(values, cum_weights=cumulative_counts)[0]
+
+    """
+    Generates the next block of execution times with NumPy
+    """
+    def generate_block(self) -> list:
+        if self.kind == "uniform":
+            steps = self.generator.integers(0, self.steps, self.block_size)
+
+        elif self.kind == "normal":
+            if self.std == 0:
+                return [self.bcet] * self.block_size
+
+            steps = np.empty(0, dtype=np.int64)
+            while len(steps) < self.block_size:
+                drawn = np.rint((self.generator.normal(self.mean, self.std, self.block_size) - self.bcet) / self.time_unit)
+                steps = np.concatenate((steps, drawn[(drawn >= 0) & (drawn < self.steps)].astype(np.int64)))
+
+            steps = steps[:self.block_size]
+
+        else:
+            values, cumulative_counts = self.histogram
+            indices = np.searchsorted(cumulative_counts, self.generator.random(self.block_size) * cumulative_counts[-1],
+                                      side="right")
+            return [values[i] for i in indices]
+
+        return (self.bcet + steps * self.time_unit).tolist()
+
+
+"""
+Loads the measured execution times of each task from a csv file with the columns Task, ExecTime and, optionally,
+Count (the number of times the value was measured, 1 if the column is missing). Returns, for each task, the
+distinct values and their cumulative counts.
+"""
+def load_histograms(histogram_file: str) -> Dict[str, tuple]:
+    df = pd.read_csv(histogram_file)
+
+    if "Count" not in df.columns:
+        df["Count"] = 1
+
+    histograms = {}
+    for task_id, measurements in df.groupby("Task", sort=False):
+        counts = measurements.groupby("ExecTime")["Count"].sum()
+        histograms[task_id] = (counts.index.tolist(), counts.cumsum().tolist())
+
+    return histograms
+
+
 # Global variable so it can be accessed when creating the tasks
 time_unit = 0
 # Global variable for current time
@@ -34,25 +206,59 @@ tasks: Dict[str, Task] = {}
 jobs: List[Job] = []
 
 """
-Responsible for handling the VSS simulation is run using the information contained on the specified file
+Responsible for handling the VSS simulation is run using the information contained on the specified file.
+With event_driven set (the default), the simulation jumps between job releases and completions instead of
+stepping through every time unit (see simulate_event_driven for where it differs from the time-stepped one).
 """
-def run_vss(file_name: str, sim_time: int, time_unit: float):
-    global current_time
-
+def run_vss(file_name: str, sim_time: int, time_unit: float, event_driven: bool = True,
+            distribution: ExecTimeDistribution = None):
     print("Running VSS simulation for " + file_name)
 
+    simulate_vss(file_name, sim_time, time_unit, event_driven, distribution)
+
+    # Append the results to the txt file
+    output_results("VSS", file_name)    
+
+
+"""
+Runs the VSS simulation of the specified file without writing the results, and returns the simulated tasks
+"""
+def simulate_vss(file_name: str, sim_time: int, time_unit: float, event_driven: bool = True,
+                 distribution: ExecTimeDistribution = None) -> Dict[str, Task]:
+    global current_time
+
     # Set the global variable for the time_unit
     globals()["time_unit"] = time_unit
 
     # Create tasks from csv
     initialize_tasks(pd.read_csv(file_name))
 
-    # Initialize jobs
-    initialize_jobs()
+    # Attach the execution time samplers, the uniform distribution without blocks is the default
+    if distribution is not None:
+        for task in tasks.values():
+            task.sampler = distribution.create_sampler(task, time_unit)
 
     # Reset the current time if running more than one simulation
     current_time = 0.0
 
+    if event_driven:
+        simulate_event_driven(sim_time, time_unit)
+    else:
+        # Initialize jobs
+        initialize_jobs()
+
+        simulate_time_stepped(sim_time, time_unit)
+
+    return tasks
+
+
+"""
+Time-stepped simulation: at every time unit, activates the released jobs and executes the highest
+priority ready job for one time unit
+"""
+def simulate_time_stepped(sim_time: int, time_unit: float):
+    global current_time
+
     while current_time <= sim_time:
         activate_task_jobs()
 
@@ -67,21 +273,8 @@ def run_vss(file_name: str, sim_time: int, time_unit: float):
             # Check if job has finished execution
             if current_job.exec_time <= 0:
                
-                task = tasks.get(current_job.task_id)
-
-                # Calculate response time 
-                response_time = current_time - current_job.release_time
-
-                # If task hasnt been considered unschedulable before, and current time is lesser or equal to the deadline, save WCRT value
-                if task.schedulable and current_time <= current_job.deadline:
-
-                    if task.wcrt < response_time:
-                        task.wcrt = response_time
-                # Else, set as unschedulable and record the WCRT value of when it misses the deadline 
-                # (only do this for tasks who aren't sc)
-                elif task.schedulable:
-                    task.schedulable = False
-                    task.wcrt = response_time
+                # The response time is measured at the start of the time unit in which the job finishes
+                record_response_time(current_job, current_time)
 
                 # Set the task job as completed
                 jobs.remove(current_job)
@@ -89,8 +282,118 @@ def run_vss(file_name: str, sim_time: int, time_unit: float):
 
         current_time += time_unit
 
-    # Append the results to the txt file
-    output_results("VSS", file_name)    
+
+# Tolerance when converting times to a number of time units, so float representation errors (e.g. 0.3 / 0.1)
+# don't add a time unit
+TICK_TOLERANCE = 1e-9
+
+
+"""
+Event-driven simulation on the grid of time units: time k * time_unit is tick k. Pending releases are kept in a
+heap ordered by release tick (and task order, so the random execution times are drawn in the same order as the
+time-stepped simulation), and ready jobs in a heap ordered by priority and release order. Between two events
+the highest priority ready job runs uninterrupted, so the simulation takes time proportional to the number of
+jobs instead of the number of time units.
+
+Jobs follow the time-stepped rules: a job with execution time e runs for ceil(e / time_unit) ticks (at least
+one, even with an execution time of 0), and its completion is observed at the start of the last tick it runs in.
+With a time unit of 1 and integer periods the results are the same as the time-stepped simulation. Otherwise
+it knowingly differs from it:
+-The m-th job of a task is released once, at the first tick at or after m * period. The time-stepped simulation
+ releases a job at every tick whose integer part is a multiple of the period, so with a time unit below 1 it
+ releases several jobs per period, and it never releases jobs of non-integer periods at the right time.
+-Tick times are computed as k * time_unit instead of adding up the time unit, so they don't drift with float
+ rounding errors.
+"""
+def simulate_event_driven(sim_time: int, time_unit: float):
+    global current_time
+
+    task_list = list(tasks.values())
+    ready_jobs = []
+    sequence = 0
+
+    # Ticks of the m-th release of a task and of the end of the simulation
+    def release_tick(task: Task, m: int) -> int:
+        return math.ceil(m * task.period / time_unit - TICK_TOLERANCE)
+
+    last_tick = math.floor(sim_time / time_unit + TICK_TOLERANCE)
+
+    # Every task releases its first job at time 0, the following ones at multiples of their period
+    releases = []
+    for index, task in enumerate(task_list):
+        heapq.heappush(ready_jobs, (task.priority, sequence, Job(task.id, task.deadline, 0.0)))
+        sequence += 1
+        releases.append((release_tick(task, 1), index, 1))
+
+    heapq.heapify(releases)
+
+    tick = 0
+    while tick <= last_tick:
+        # Release the jobs of the tasks activated at this tick
+        while releases and releases[0][0] == tick:
+            _, index, m = heapq.heappop(releases)
+            task = task_list[index]
+
+            current_time = tick * time_unit
+            job = Job(task.id, current_time + task.deadline, current_time)
+            heapq.heappush(ready_jobs, (task.priority, sequence, job))
+            sequence += 1
+
+            heapq.heappush(releases, (release_tick(task, m + 1), index, m + 1))
+
+        next_release = releases[0][0] if releases else math.inf
+
+        # Idle until the next release
+        if not ready_jobs:
+            tick = next_release
+            continue
+
+        current_job = ready_jobs[0][2]
+
+        # Tick in which the job finishes if it isn't preempted
+        finish_tick = tick + max(1, math.ceil(current_job.exec_time / time_unit - TICK_TOLERANCE)) - 1
+
+        # Preempted (or at least rescheduled) at the next release
+        if next_release <= finish_tick:
+            current_job.exec_time -= (next_release - tick) * time_unit
+            tick = next_release
+            continue
+
+        if finish_tick > last_tick:
+            break
+
+        heapq.heappop(ready_jobs)
+        current_time = finish_tick * time_unit
+        record_response_time(current_job, current_time)
+
+        tick = finish_tick + 1
+
+    current_time = float(min(tick, last_tick + 1) * time_unit)
+
+
+"""
+Records the response time of a job that finished at completion_time on its task's WCRT
+"""
+def record_response_time(job: Job, completion_time: float):
+    task = tasks.get(job.task_id)
+
+    # Calculate response time 
+    response_time = completion_time - job.release_time
+
+    task.completed_jobs += 1
+    task.max_response_time = max(task.max_response_time, response_time)
+    if completion_time > job.deadline:
+        task.missed_deadlines += 1
+
+    # If task hasnt been considered unschedulable before, and current time is lesser or equal to the deadline, save WCRT value
+    if task.schedulable and completion_time <= job.deadline:
+
+        if task.wcrt < response_time:
+            task.wcrt = response_time
+    # Else, set as unschedulable and record the WCRT value of when it misses the deadline 
+    elif task.schedulable:
+        task.schedulable = False
+        task.wcrt = response_time
     
 
 """
@@ -100,18 +403,15 @@ def initialize_tasks(df: pd.DataFrame):
     # Ensure the list is clean if running more than one simulation
     tasks.clear()
 
-    for index, row in df.iterrows():
-        task = Task(
-            row["Task"],
-            row["WCET"],
-            row["BCET"],
-            row["Period"],
-            row["Deadline"],
-            row["Priority"]    
-        )
+    # Read the columns once instead of building a Series per row
+    columns = zip(df["Task"].tolist(), df["WCET"].tolist(), df["BCET"].tolist(),
+                  df["Period"].tolist(), df["Deadline"].tolist(), df["Priority"].tolist())
+
+    for id, wcet, bcet, period, deadline, priority in columns:
+        task = Task(id, wcet, bcet, period, deadline, priority)
         
         # Add to dictionary, mapped to its id
-        tasks[row["Task"]] = task
+        tasks[id] = task
 
         
 """
@@ -183,12 +483,15 @@ def gen_random_comp_time(job : Job) -> float:
     
 
 """
-Generates random computation time for a task
+Generates random computation time for a task, with the task's sampler if it has one
 """
 def gen_random_comp_time_task(task: Task) -> float:
-    # Calculate computation time with a random value between bcet and wcet using time_unit intervals
-    rd_values = [task.bcet + i * time_unit for i in range(int((task.wcet - task.bcet) // time_unit) + 1)]
-    return random.choice(rd_values)
+    if task.sampler is not None:
+        return task.sampler.sample()
+
+    # Calculate computation time with a random value between bcet and wcet using time_unit intervals.
+    # Drawing the index directly gives the same value as random.choice on the list of every candidate value
+    return task.bcet + random.randrange(int((task.wcet - task.bcet) // time_unit) + 1) * time_unit
 
 
 """
@@ -196,10 +499,27 @@ Responsible for handling the RTA simulation is run using the information contain
 """
 def run_rta(file_name: str):
     print("Running RTA simulation for " + file_name)
-    
+
+    response_time_analysis(file_name)
+
+    # Append the results to the txt file
+    output_results("RTA", file_name)
+
+
+"""
+Runs the response time analysis of the specified file without writing the results, and returns the analysed tasks
+"""
+def response_time_analysis(file_name: str) -> Dict[str, Task]:
     # Create tasks from csv
     initialize_tasks(pd.read_csv(file_name))
 
+    return analyse_tasks()
+
+
+"""
+Runs the response time analysis of the tasks currently loaded, and returns them
+"""
+def analyse_tasks() -> Dict[str, Task]:
     # Sort tasks by priority. (Eg: In Rate Monotonic the priority is defined by the period, shorter period = larger priority)
     sorted_tasks_dict = dict(sorted(tasks.items(), key=lambda item: item[1].priority))
 
@@ -211,33 +531,292 @@ def run_rta(file_name: str):
 
         task = sorted_tasks[i]
 
-        R = 0  
-        R_old = 0
+        R, task.schedulable = task_response_time(task, sorted_tasks[:i], task.wcet)
+
+        task.wcrt = math.ceil(R)
+
+    return tasks
+
+
+"""
+Response time fixpoint iteration of a task, starting at R = start, which must be a lower bound of the response time
+(and at least the task's WCET). Returns the final R and whether the task is schedulable. For an unschedulable task,
+R is the first value of the iteration above the deadline.
+"""
+def task_response_time(task: Task, higher_priority_tasks: List[Task], start: float) -> tuple:
+    R = start
+
+    while True:
+        # Break if unschedulable
+        if R > task.deadline:
+            return R, False
+
+        # Calculate interference from higher priority tasks
         interference = 0
 
-        while True:
-            R_old = R
-            R = interference + task.wcet
+        for hp_task in higher_priority_tasks:
+            interference += math.ceil(R / hp_task.period) * hp_task.wcet
 
-            # Break if unschedulable
-            if R > task.deadline:
-                task.schedulable = False
-                break
-                       
-            # Calculate interference from higher priority tasks
-            interference = 0
+        # The task is schedulable and R contains the theoretical wcrt value
+        if interference + task.wcet <= R:
+            return R, True
 
-            for j in range(i):
-                interference += math.ceil(R / sorted_tasks[j].period) * sorted_tasks[j].wcet
+        R = interference + task.wcet
 
-            # The task is schedulable and R contains the theoretical wcrt value
-            if R <= R_old: 
-                break
 
-        task.wcrt = math.ceil(R)
+"""
+Responsible for finding an optimal priority assignment for the task set in the specified file, and appending the
+RTA results of the task set with the new priorities to the 'results-OPA' txt file. If no priority assignment makes
+the task set schedulable, the results are those of the priorities in the file. Returns whether an assignment was found.
+"""
+def run_opa(file_name: str) -> bool:
+    print("Running optimal priority assignment for " + file_name)
+
+    initialize_tasks(pd.read_csv(file_name))
+
+    optimal_order = audsley_priority_assignment(list(tasks.values()))
+
+    if optimal_order is not None:
+        for priority, task in enumerate(optimal_order):
+            task.priority = priority
+
+    analyse_tasks()
 
     # Append the results to the txt file
-    output_results("RTA", file_name)
+    output_results("OPA", file_name)
+
+    return optimal_order is not None
+
+
+"""
+Audsley's optimal priority assignment, using the response time analysis of a single task as test. From the lowest
+priority level up, assigns to each level a task that is schedulable with every unassigned task above it. The test
+of a task only depends on the set of its higher priority tasks, so this finds a feasible assignment if any exists,
+with n^2 single task tests at most. Candidates are tried from the lowest given priority, so a feasible given
+assignment is kept. Returns the tasks from the highest to the lowest priority, or None if there's no feasible
+assignment.
+"""
+def audsley_priority_assignment(task_list: List[Task]) -> List[Task]:
+    # Lowest priority first, ties in reverse order of the list (earlier tasks win ties in the analysis)
+    unassigned = [task for _, task in sorted(enumerate(task_list), key=lambda item: (item[1].priority, item[0]), reverse=True)]
+    assigned = []
+
+    while unassigned:
+        for task in unassigned:
+            higher_priority_tasks = [other for other in unassigned if other is not task]
+
+            if task_response_time(task, higher_priority_tasks, task.wcet)[1]:
+                break
+        else:
+            return None
+
+        unassigned.remove(task)
+        assigned.append(task)
+
+    assigned.reverse()
+    return assigned
+
+
+"""
+Incremental response time analysis, for exploring priority, WCET and period changes of a task set without
+re-running the whole analysis. Every fixpoint iteration is warm-started at a lower bound of the response time:
+-the response time of the previous task in priority order plus the task's own WCET (a task's response time is at
+ least the one of the task right above it plus its WCET, if the WCET is positive)
+-the task's previous result, when the change can only increase its interference (larger WCET or shorter period of a
+ higher priority task, or a task moving above it)
+update() applies a change to one task and only recomputes the tasks it affects. The WCRT and schedulability of
+schedulable tasks are the same as with response_time_analysis; for unschedulable tasks the WCRT is a value of the
+iteration above the deadline, which can differ from the one of a cold start.
+"""
+class IncrementalRTA:
+    def __init__(self, task_list: List[Task]):
+        # Ties in priority keep the original order of the tasks, as in response_time_analysis
+        self.index = {task.id: i for i, task in enumerate(task_list)}
+        self.tasks = {task.id: task for task in task_list}
+        self.order = sorted(task_list, key=lambda task: (task.priority, self.index[task.id]))
+        # Final R of the fixpoint iteration of each task
+        self.response_times: Dict[str, float] = {}
+
+        self.analyse(range(len(self.order)), set())
+
+    """
+    Creates the incremental analysis of the task set in the specified file
+    """
+    @classmethod
+    def from_file(cls, file_name: str) -> "IncrementalRTA":
+        initialize_tasks(pd.read_csv(file_name))
+
+        return cls(list(tasks.values()))
+
+    """
+    Changes the WCET, period, deadline and/or priority of a task, and recomputes the response times of the tasks
+    affected by the change. Returns the ids of the recomputed tasks.
+    """
+    def update(self, task_id: str, wcet: float = None, period: float = None, deadline: float = None,
+               priority: float = None) -> List[str]:
+        task = self.tasks[task_id]
+        old_position = self.order.index(task)
+
+        # A larger WCET or a shorter period only increases the interference on the tasks below, and vice versa
+        more_demand = (wcet is not None and wcet > task.wcet) or (period is not None and period < task.period)
+        less_demand = (wcet is not None and wcet < task.wcet) or (period is not None and period > task.period)
+
+        if wcet is not None:
+            task.wcet = wcet
+        if period is not None:
+            task.period = period
+        if deadline is not None:
+            task.deadline = deadline
+
+        new_position = old_position
+        if priority is not None and priority != task.priority:
+            task.priority = priority
+            self.order.sort(key=lambda t: (t.priority, self.index[t.id]))
+            new_position = self.order.index(task)
+
+        # The deadline doesn't change the response time fixpoint, only when the iteration stops
+        positions = {old_position}
+
+        # Tasks between the old and new positions gain or lose the task as higher priority
+        positions.update(range(min(old_position, new_position), max(old_position, new_position) + 1))
+
+        if more_demand or less_demand:
+            positions.update(range(new_position, len(self.order)))
+
+        # Previous results remain lower bounds unless a task's interference (or own WCET) can decrease
+        valid_bounds = set()
+        if not less_demand:
+            for position in positions:
+                other = self.order[position]
+
+                if other is task:
+                    moved_up = new_position < old_position
+                else:
+                    # Tasks above the new position lose the task as higher priority
+                    moved_up = position < new_position
+
+                if not moved_up:
+                    valid_bounds.add(other.id)
+
+        self.analyse(sorted(positions), valid_bounds)
+
+        return [self.order[position].id for position in sorted(positions)]
+
+    """
+    Runs the fixpoint iteration of the tasks in the given positions (in increasing order), warm-started at the
+    largest known lower bound of their response times
+    """
+    def analyse(self, positions, valid_bounds: set):
+        for position in positions:
+            task = self.order[position]
+
+            start = task.wcet
+            # Only holds for a positive WCET, a task without execution time has a response time of 0
+            if position > 0 and task.wcet > 0:
+                start = max(start, self.response_times[self.order[position - 1].id] + task.wcet)
+            if task.id in valid_bounds:
+                start = max(start, self.response_times[task.id])
+
+            R, task.schedulable = task_response_time(task, self.order[:position], start)
+
+            self.response_times[task.id] = R
+            task.wcrt = math.ceil(R)
+
+
+"""
+Batch RTA over many task sets at once. The paths can be csv files or directories, whose csv files are all
+analysed (in name order). The task sets are loaded into arrays padded to the size of the largest one, and the
+response time fixpoint iteration runs for every task of every set simultaneously. Returns a single table with a
+row per task (in the order of each file) with its WCRT and schedulability, and the schedulability of its task
+set, which is also written to output_file if given.
+"""
+def run_rta_batch(paths: List[str], output_file: str = "results-RTA-batch.csv") -> pd.DataFrame:
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.csv"))) if os.path.isdir(path) else [path])
+
+    print("Running RTA for " + str(len(files)) + " task sets")
+
+    frames = [pd.read_csv(file_name) for file_name in files]
+    counts = np.array([len(df) for df in frames], dtype=np.int64)
+    size = int(counts.max()) if len(frames) else 0
+
+    # Padding tasks have the lowest priority, no execution time and no deadline, so they don't interfere
+    wcets = np.zeros((len(frames), size))
+    periods = np.ones((len(frames), size))
+    deadlines = np.full((len(frames), size), math.inf)
+    priorities = np.full((len(frames), size), math.inf)
+
+    for i, df in enumerate(frames):
+        wcets[i, :counts[i]] = df["WCET"].to_numpy(dtype=float)
+        periods[i, :counts[i]] = df["Period"].to_numpy(dtype=float)
+        deadlines[i, :counts[i]] = df["Deadline"].to_numpy(dtype=float)
+        priorities[i, :counts[i]] = df["Priority"].to_numpy(dtype=float)
+
+    wcrt, schedulable = response_time_analysis_arrays(wcets, periods, deadlines, priorities)
+
+    valid = np.arange(size) < counts[:, None]
+    taskset_schedulable = np.repeat((schedulable | ~valid).all(axis=1), counts)
+
+    results = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    results.insert(0, "Taskset", np.repeat(files, counts))
+    results["WCRT"] = wcrt[valid]
+    results["Schedulable"] = schedulable[valid]
+    results["Taskset_Schedulable"] = taskset_schedulable
+
+    if output_file is not None:
+        results.to_csv(output_file, index=False)
+
+    return results
+
+
+# Upper bound of the elements of the (task sets, tasks, tasks) interference arrays of a batch RTA block
+RTA_BLOCK_SIZE = 1 << 22
+
+"""
+Vectorized RTA of task sets stored in (task sets, tasks) arrays, with the same results as response_time_analysis:
+tasks are ordered by priority (ties keep their order), every task starts its fixpoint iteration at its WCET,
+and stops when R is above the deadline (unschedulable) or stops growing. Returns the WCRT (the ceiling of the
+final R) and the schedulability of every task, in the original order.
+"""
+def response_time_analysis_arrays(wcets: np.ndarray, periods: np.ndarray, deadlines: np.ndarray,
+                                  priorities: np.ndarray) -> tuple:
+    order = np.argsort(priorities, axis=1, kind="stable")
+    wcets, periods, deadlines = (np.take_along_axis(values, order, axis=1) for values in (wcets, periods, deadlines))
+
+    sets, size = wcets.shape
+    R = wcets.copy()
+    schedulable = np.ones((sets, size), dtype=bool)
+    active = np.ones((sets, size), dtype=bool)
+
+    # higher_priority[i, j] is set when the task in position j interferes with the task in position i
+    higher_priority = np.tri(size, k=-1, dtype=bool)
+    block = max(1, RTA_BLOCK_SIZE // max(1, size * size))
+
+    while True:
+        # Tasks whose R exceeds the deadline are unschedulable, and keep that R
+        missed = active & (R > deadlines)
+        schedulable[missed] = False
+        active &= ~missed
+
+        pending = np.flatnonzero(active.any(axis=1))
+        if len(pending) == 0:
+            break
+
+        for start in range(0, len(pending), block):
+            rows = pending[start:start + block]
+
+            demand = np.ceil(R[rows][:, :, None] / periods[rows][:, None, :]) * wcets[rows][:, None, :]
+            R_next = np.where(higher_priority, demand, 0.0).sum(axis=2) + wcets[rows]
+
+            # The iteration is monotonic, so a task converged when R doesn't grow
+            active[rows] &= R_next > R[rows]
+            R[rows] = np.where(active[rows], R_next, R[rows])
+
+    inverse = np.argsort(order, axis=1)
+    wcrt = np.take_along_axis(np.ceil(R), inverse, axis=1).astype(np.int64)
+
+    return wcrt, np.take_along_axis(schedulable, inverse, axis=1)
 
 
 """
@@ -267,3 +846,97 @@ def output_results(res_origin: str, app_model: str):
         file.write("\nAccording to the results, this taskset is " + sched_result + "\n")
 
         file.write("\n\n")      
+
+
+"""
+Runs a single seeded VSS replication and returns, for each task, its maximum observed response time,
+the WCRT reported by the VSS, whether it stayed schedulable, and its number of completed jobs and
+missed deadlines. Defined at module level so it can be sent to worker processes.
+"""
+def vss_replication(file_name: str, sim_time: int, time_unit: float, seed: int, event_driven: bool = True,
+                    distribution: ExecTimeDistribution = None) -> Dict[str, tuple]:
+    random.seed(seed)
+
+    simulated_tasks = simulate_vss(file_name, sim_time, time_unit, event_driven, distribution)
+
+    return {task.id: (task.max_response_time, task.wcrt, task.schedulable, task.completed_jobs, task.missed_deadlines)
+            for task in simulated_tasks.values()}
+
+
+"""
+Monte-Carlo batch mode of the VSS: runs `replications` simulations of the specified file seeded with
+seed, seed + 1, ..., across a pool of worker processes (a single worker runs them in this process), and
+aggregates for each task the distribution of the maximum observed response time, the probability of a
+deadline miss in a run, the ratio of missed deadlines over completed jobs, and how close the observed
+maximum gets to the RTA bound. The aggregate does not depend on the number of workers.
+"""
+def run_vss_batch(file_name: str, sim_time: int, time_unit: float, replications: int, seed: int = 0,
+                  workers: int = None, event_driven: bool = True,
+                  distribution: ExecTimeDistribution = None) -> Dict[str, dict]:
+    print("Running " + str(replications) + " VSS simulations for " + file_name)
+
+    seeds = range(seed, seed + replications)
+
+    if workers == 1:
+        runs = [vss_replication(file_name, sim_time, time_unit, run_seed, event_driven, distribution) for run_seed in seeds]
+    else:
+        chunksize = max(1, replications // (4 * (workers or os.cpu_count() or 1)))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            runs = list(executor.map(vss_replication, repeat(file_name), repeat(sim_time), repeat(time_unit), seeds,
+                                     repeat(event_driven), repeat(distribution), chunksize=chunksize))
+
+    # The RTA bound of each task, computed after the simulations since both share the global tasks
+    rta_tasks = response_time_analysis(file_name)
+
+    results = {}
+    for task_id, task in rta_tasks.items():
+        observed = sorted(run[task_id][0] for run in runs)
+        completed_jobs = sum(run[task_id][3] for run in runs)
+        missed_deadlines = sum(run[task_id][4] for run in runs)
+        observed_max = observed[-1] if observed else -1
+
+        results[task_id] = {
+            "replications": len(runs),
+            "observed_wcrt_max": observed_max,
+            "observed_wcrt_mean": sum(observed) / len(observed) if observed else -1,
+            "observed_wcrt_p95": observed[math.ceil(0.95 * len(observed)) - 1] if observed else -1,
+            "miss_probability": sum(1 for run in runs if not run[task_id][2]) / len(runs) if runs else 0.0,
+            "job_miss_ratio": missed_deadlines / completed_jobs if completed_jobs else 0.0,
+            "deadline": task.deadline,
+            "rta_wcrt": task.wcrt,
+            "rta_schedulable": task.schedulable,
+            # Fraction of the RTA bound reached by the largest observed response time
+            "rta_ratio": observed_max / task.wcrt if task.wcrt > 0 and observed_max >= 0 else None,
+        }
+
+    output_batch_results(file_name, sim_time, time_unit, seed, results)
+
+    return results
+
+
+"""
+Appends the aggregated results of a VSS batch to the 'results-VSS-batch' txt file
+"""
+def output_batch_results(app_model: str, sim_time: int, time_unit: float, seed: int, results: Dict[str, dict]):
+    with open("results-VSS-batch.txt", "a") as file:
+        replications = next(iter(results.values()))["replications"] if results else 0
+
+        file.write("VSS batch results for application model in " + app_model + "\n")
+        file.write("Replications: " + str(replications) + " | Seeds: " + str(seed) + "-" + str(seed + replications - 1) +
+                   " | Simulation time: " + str(sim_time) + " | Time unit: " + str(time_unit) + "\n\n")
+
+        for task_id, result in results.items():
+            rta_ratio = "-" if result["rta_ratio"] is None else "{:.3f}".format(result["rta_ratio"])
+
+            file.write("Task_id: " + task_id +
+                       " | Observed WCRT max: " + str(result["observed_wcrt_max"]) +
+                       " | mean: " + "{:.2f}".format(result["observed_wcrt_mean"]) +
+                       " | p95: " + str(result["observed_wcrt_p95"]) +
+                       " | RTA WCRT: " + str(result["rta_wcrt"]) +
+                       " | Observed/RTA: " + rta_ratio +
+                       " | Deadline: " + str(result["deadline"]) +
+                       " | Miss probability: " + "{:.4f}".format(result["miss_probability"]) +
+                       " | Job miss ratio: " + "{:.6f}".format(result["job_miss_ratio"]) + "\n")
+
+        file.write("\n\n")
@@ -1,4 +1,14 @@
 import exercise as ex
+import sys
+
+#batch mode: the csv files (or directories of csv files) passed as arguments are analysed together, without prompts
+if len(sys.argv) > 1:
+    results = ex.run_rta_batch(sys.argv[1:])
+    tasksets = results.drop_duplicates("Taskset")
+
+    print(str(int(tasksets["Taskset_Schedulable"].sum())) + " of " + str(len(tasksets)) + " task sets are schedulable")
+    print("Analysis complete. Results have been outputed to results-RTA-batch.csv")
+    sys.exit(0)
 
 #RTA start
 print("""
@@ -0,0 +1,46 @@
+import exercise as ex
+
+if __name__ == "__main__":
+    #VSS batch start
+    print("""
+===========================================
+      Very Simple Simulator (VSS) - Batch
+===========================================
+      
+The batch mode runs many independently seeded VSS simulations of each application model in parallel
+worker processes, and aggregates the results of every task over all the runs:
+-Maximum, mean and 95th percentile of the worst-case response time (WCRT) observed in each run
+-How close the largest observed WCRT gets to the WCRT bound calculated by the RTA algorithm
+-Probability of a run missing a deadline of the task, and ratio of missed deadlines over completed jobs
+      
+The csv files follow the same format as for the VSS, and more than one can be passed separated by commas (,).
+Run i uses the random seed (seed + i), so a batch can be reproduced with the same seed.
+      
+The results will be appended to a txt file called 'results-VSS-batch'
+""")
+
+    #clean results file
+    with open("results-VSS-batch.txt", "w") as file:
+        pass
+
+    #ask for csv file(s) containing the model and store the data
+    csv_input = input("Specify the csv file(s) that contain the application model: ")
+    csv_files = [file_name.strip() for file_name in csv_input.split(",")]
+
+    #ask for the simulation parameters and store them
+    sim_time = int(input("Input the desired simulation time: "))
+    time_unit = float(input("Input the desired time unit: "))
+    #ask for the distribution of the execution times (uniform if left empty)
+    kind = input("Input the execution time distribution (uniform, normal, empirical): ").strip() or "uniform"
+    histogram_file = input("Specify the csv file with the measured execution times: ").strip() if kind == "empirical" else None
+    distribution = ex.ExecTimeDistribution(kind, histogram_file)
+    replications = int(input("Input the number of simulations: "))
+    seed = int(input("Input the first random seed: ") or 0)
+    workers = int(input("Input the number of worker processes (0 uses every CPU): ") or 0)
+
+    #run the batch(es)
+    for file_name in csv_files:
+        ex.run_vss_batch(file_name, sim_time, time_unit, replications, seed, workers or None, distribution=distribution)
+
+    #simulation complete
+    print("Simulation(s) complete. Results have been outputed to results-VSS-batch.txt")
@@ -32,6 +32,10 @@ separator should be (.)
       
 The simulator will apply its logic for (simulation time / time unit) amount of times.
 
+Finally, you will be asked for the distribution of the jobs' execution times between BCET and WCET: uniform
+(the default if left empty), normal (truncated to [BCET, WCET]) or empirical. The empirical distribution reads
+the measured execution times of each task from a csv file with the columns Task, ExecTime and Count.
+
 If multiple csv files were passed, the same simulation time and time unit will be used for each simulation.
       
 The simulator will print the results to a txt file called 'results-VSS' 
@@ -51,9 +55,14 @@ sim_time = int(input("Input the desired simulation time: "))
 #ask for time unit value and store it
 time_unit = float(input("Input the desired time unit: "))
 
+#ask for the distribution of the execution times (uniform if left empty)
+kind = input("Input the execution time distribution (uniform, normal, empirical): ").strip() or "uniform"
+histogram_file = input("Specify the csv file with the measured execution times: ").strip() if kind == "empirical" else None
+distribution = ex.ExecTimeDistribution(kind, histogram_file)
+
 #run the simulation(s)
 for file_name in csv_files:
-    ex.run_vss(file_name, sim_time, time_unit)
+    ex.run_vss(file_name, sim_time, time_unit, distribution=distribution)
 
 #simulation complete
 print("Simulation(s) complete. Results have been outputed to results-VSS.txt")
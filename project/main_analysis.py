@@ -1,5 +1,13 @@
-from source.analysis import dbf_component_EDF, dbf_component_RM
-from source.project_lib import cores_registry, initialize_csv_data, initialize_analysis_data, Scheduler
+from source.analysis import analyse_component_arrays, component_arrays, dbf_component_RM, \
+    optimal_priorities_component_RM, minimal_budget_arrays, synthesize_core, half_half_interface, \
+    sensitivity_arrays, schedulable_core, task_arrays, CORE_TESTS
+from source.analysis_cache import AnalysisCache, component_key
+from source.project_lib import load_model, Scheduler, SystemModel
+from source.results import ResultsSink, RESULT_FORMATS
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import copy
+import math
 import os
 
 
@@ -8,89 +16,381 @@ if not os.path.exists("output"):
     os.makedirs("output")
 
 ANALYSIS_OUTPUT = "output/results_analysis.csv"
+SYNTHESIS_OUTPUT = "output/results_synthesis.csv"
+SENSITIVITY_OUTPUT = "output/results_sensitivity.csv"
+
+ANALYSIS_COLUMNS = ("Task_ID", "adjusted_WCET", "Priority", "Task_Schedulable", "Component_ID",
+                    "Component_Schedulable")
+SYNTHESIS_COLUMNS = ("Component_ID", "Core_ID", "Period", "Budget", "Min_Budget", "Min_Alfa", "Max_Delta",
+                     "Core_Utilization", "Core_Schedulable")
+SENSITIVITY_COLUMNS = ("Level", "ID", "Component_ID", "Core_ID", "WCET_Scaling", "Min_Speed_Factor")
 
 
 """
     Analyse the entire cores and components distribution
 
+    >   Parameters:
+        - model: SystemModel to analyse (it isn't changed)
+        - workers: number of worker processes used to analyse the components.
+        With 1 (default) the analysis runs serially, with None one process
+        per CPU is used.
+        - optimal_priorities: search an optimal (Audsley) priority assignment
+        for the tasks of the RM components that aren't schedulable with the
+        given priorities
+        - core_test: "exact" (default) or "bound" core level test (see
+        analysis.schedulable_core)
+        - use_cache: reuse the results of components analysed by previous runs
+        (see analyse_components)
+        - results_format: format of the results file (see results.ResultsSink)
     >   Return:
         (1)
             -   True:   System is schedulable
             -   False:  System is not schedulable
         (2)
             -   Array of unschedulable components if false
+        (3)
+            -   Array of schedulable components
+        (4)
+            -   Array of components made schedulable by reassigning priorities
 """
-def analyse_system():
+def analyse_system(model: SystemModel, workers: int = 1, optimal_priorities: bool = False,
+                   core_test: str = "exact", use_cache: bool = True, results_format: str = "csv"):
     system_schedulable = True
     unschedulable_components = []
     schedulable_components = []
-    
-    initialize_csv_data()
-    initialize_analysis_data()
-
-    #   Clear and initialize CSV results file
-    with open(ANALYSIS_OUTPUT, "w") as f:
-        f.write("Task_ID,adjusted_WCET,Priority,Task_Schedulable,Component_ID,Component_Schedulable\n")
+    reassigned_components = []
 
-    #   Make a copy of cores registry
-    cores_register = cores_registry.copy()
+    #   Results are collected and written at once when every component is analysed
+    results_sink = ResultsSink(ANALYSIS_OUTPUT, ANALYSIS_COLUMNS, results_format, index=("Component_ID",))
 
     #   Check if cores are schedulable
-    for core in cores_register.values():
-        if not core.simple_scheduler():
+    schedulable_cores = []
+    for core in model.cores.values():
+        if not schedulable_core(core, core_test):
             system_schedulable = False
 
             for component in core.root_comp.children:
                 unschedulable_components.append(component._component_id)
+        else:
+            schedulable_cores.append(core)
 
-            #   Remove core from cores
-            del cores_registry[core._core_id]
+    #   Components of the schedulable cores, in the order results are reported
+    components = [component for core in schedulable_cores for component in core.root_comp.children]
 
     #   Check if components are schedulable
-    for core in cores_registry.values():
+    results = analyse_components(model, components, workers, use_cache)
+
+    for component, (schedulable, schedulable_tasks) in zip(components, results):
+        #   Replace the priorities of failed RM components by a feasible assignment, if there is one
+        if not schedulable and optimal_priorities and component._scheduler == Scheduler.RM:
+            optimal_order = optimal_priorities_component_RM(component)
+
+            if optimal_order is not None:
+                reassigned_component = reassign_priorities(component, optimal_order)
+
+                #   Confirm with the regular test, keeping the given priorities if it disagrees
+                new_schedulable, new_schedulable_tasks = dbf_component_RM(reassigned_component)
+
+                if new_schedulable:
+                    component = reassigned_component
+                    schedulable, schedulable_tasks = new_schedulable, new_schedulable_tasks
+                    reassigned_components.append(component._component_id)
+
+        sorted_tasks = []
+        if component._scheduler == Scheduler.RM:
+            sorted_tasks = sorted(component.children, \
+                                  key=lambda _task: _task._priority, reverse=False)
+        elif component._scheduler == Scheduler.EDF:
+            sorted_tasks = component.children
+
+        #   Add results to the results file
+        write_results(results_sink,sorted_tasks,schedulable_tasks,component,schedulable)
+
+        if not schedulable:
+            system_schedulable = False
+            unschedulable_components.append(component._component_id)
+        else:
+            schedulable_components.append(component._component_id)
+
+    results_sink.close()
+
+    return system_schedulable, unschedulable_components, schedulable_components, reassigned_components
+
+
+
+"""
+    Runs the analysis of the components (see analysis.analyse_component), in
+    worker processes unless workers is 1. Workers only receive the plain
+    parameters of each component (see analysis.component_arrays), since
+    pickling a Component also pickles the whole core its parent links to.
+    With use_cache the results are memoized on disk by
+    a hash of each component's parameters (see analysis_cache), so only the
+    components that weren't analysed by previous runs, e.g. the ones whose
+    tasks changed, are analysed again.
+
+    >   Return:
+        -   Array with the result of each component, in the given order
+"""
+def analyse_components(model: SystemModel, components, workers: int = 1, use_cache: bool = True):
+    results = [None] * len(components)
+
+    if use_cache:
+        cache = AnalysisCache()
+        keys = [component_key(component, model.cores[component._core_id]._speed_factor)
+                for component in components]
+
+        cached_results = cache.get_many(keys)
+        results = [cached_results.get(key) for key in keys]
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    pending_inputs = [component_arrays(components[i]) for i in pending]
+
+    if workers == 1 or len(pending_inputs) <= 1:
+        pending_results = [analyse_component_arrays(*inputs) for inputs in pending_inputs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            #   Results are gathered in submission order so the output is deterministic
+            futures = [executor.submit(analyse_component_arrays, *inputs) for inputs in pending_inputs]
+            pending_results = [future.result() for future in futures]
+
+    for i, result in zip(pending, pending_results):
+        results[i] = result
+
+    if use_cache:
+        cache.put_many((keys[i], results[i]) for i in pending)
+        cache.close()
+
+    return results
+
+
+
+"""
+    Copy of a component whose tasks (also copies) get their priority from
+    their position in the given order (0 for the first one), so the model
+    isn't changed.
+"""
+def reassign_priorities(component, order):
+    priorities = {task._id: priority for priority, task in enumerate(order)}
+
+    reassigned_component = copy.copy(component)
+    reassigned_component.children = []
+
+    for task in component.children:
+        reassigned_task = copy.copy(task)
+        reassigned_task._priority = priorities[task._id]
+        reassigned_component.add_child(reassigned_task)
+
+    return reassigned_component
+
+
+"""
+    Synthesizes the minimal budget of every component (keeping its period and
+    the half-half interface), instead of checking the budgets of budgets.csv,
+    and checks whether each core can provide the minimal budgets of its
+    components. Results are written to SYNTHESIS_OUTPUT, in the given
+    results format.
+
+    >   Parameters:
+        - model: SystemModel to synthesize the budgets of
+        - workers: number of worker processes used to synthesize the components.
+        With 1 (default) the synthesis runs serially, with None one process
+        per CPU is used.
+        - core_test: "exact" (default) or "bound" core level test
+        - results_format: format of the results file (see results.ResultsSink)
+    >   Return:
+        -   Dictionary with the utilization demanded by the minimal budgets of
+            each core, and whether the core can provide it
+"""
+def synthesize_system(model: SystemModel, workers: int = 1, core_test: str = "exact",
+                      results_format: str = "csv"):
+    components = [component for core in model.cores.values() for component in core.root_comp.children]
+
+    #   Workers only receive the plain parameters (see analyse_components)
+    inputs = [(component._scheduler, component._period) + task_arrays(component.children)
+              for component in components]
+
+    if workers == 1:
+        budgets = [minimal_budget_arrays(*component_inputs) for component_inputs in inputs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(minimal_budget_arrays, *component_inputs) for component_inputs in inputs]
+            budgets = [future.result() for future in futures]
+
+    minimal_budgets = {component._component_id: budget for component, budget in zip(components, budgets)}
+
+    cores_results = {}
+    results_sink = ResultsSink(SYNTHESIS_OUTPUT, SYNTHESIS_COLUMNS, results_format, index=("Component_ID",),
+                               column_formats={"Period": "{}", "Budget": "{}", "Min_Alfa": "{:.6f}",
+                                               "Core_Utilization": "{:.6f}"})
+
+    for core in model.cores.values():
+        _, utilization, core_schedulable = synthesize_core(core, minimal_budgets, core_test)
+        cores_results[core._core_id] = (utilization, core_schedulable)
+
         for component in core.root_comp.children:
-            sorted_tasks = []
-            if component._scheduler == Scheduler.RM:
-                sorted_tasks = sorted(component.children, \
-                                      key=lambda _task: _task._priority, reverse=False)
-                schedulable, schedulable_tasks = dbf_component_RM(component)
-            elif component._scheduler == Scheduler.EDF:
-                sorted_tasks = component.children
-                schedulable, schedulable_tasks = dbf_component_EDF(component)
-
-            #   Write results to CSV file
-            write_results(sorted_tasks,schedulable_tasks,component,schedulable)
-
-            if not schedulable:
-                system_schedulable = False
-                unschedulable_components.append(component._component_id)
-            else:
-                schedulable_components.append(component._component_id)
+            budget = minimal_budgets[component._component_id]
+
+            alfa, delta = None, None
+            if budget is not None:
+                alfa, delta = half_half_interface(budget, component._period)
+
+            results_sink.add((component._component_id, core._core_id, component._period, component._budget,
+                              budget, alfa, delta, float(utilization), bool(core_schedulable)))
+
+    results_sink.close()
 
-    return system_schedulable, unschedulable_components, schedulable_components
+    return cores_results
 
 
 
 """
-    Write results to CSV file. Receive the sorted tasks, schedulable tasks,
+    Sensitivity analysis of the system: the largest factor the WCETs can be
+    scaled by (each task on its own, all the tasks of a component, and all the
+    tasks of a core) with the components still passing their dbf test and the
+    core passing the core test, and the slowest speed_factor each component
+    and core can run at. Results are written to SENSITIVITY_OUTPUT, in the
+    given results format.
+
+    The core test only depends on the budgets, so a core that fails it has a
+    factor of 0, and otherwise the factor of its most constrained component.
+
+    >   Parameters:
+        - model: SystemModel to analyse
+        - workers: number of worker processes used to analyse the components.
+        With 1 (default) the analysis runs serially, with None one process
+        per CPU is used.
+        - core_test: "exact" (default) or "bound" core level test
+        - results_format: format of the results file (see results.ResultsSink)
+    >   Return:
+        -   Dictionary with the WCET scaling factor and minimum speed_factor of
+            each core
+"""
+def sensitivity_system(model: SystemModel, workers: int = 1, core_test: str = "exact",
+                       results_format: str = "csv"):
+    components = [component for core in model.cores.values() for component in core.root_comp.children]
+
+    #   Workers only receive the plain parameters (see analyse_components)
+    inputs = [component_arrays(component) for component in components]
+
+    if workers == 1:
+        results = [sensitivity_arrays(*component_inputs) for component_inputs in inputs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(sensitivity_arrays, *component_inputs) for component_inputs in inputs]
+            results = [future.result() for future in futures]
+
+    factors = {component._component_id: result for component, result in zip(components, results)}
+
+    cores_results = {}
+    results_sink = ResultsSink(SENSITIVITY_OUTPUT, SENSITIVITY_COLUMNS, results_format, index=("Component_ID",),
+                               float_format="{:.6f}")
+
+    for core in model.cores.values():
+        core_factor = 0.0
+        if schedulable_core(core, core_test):
+            core_factor = min((factors[component._component_id][0] for component in core.root_comp.children),
+                              default=math.inf)
+
+        for component in core.root_comp.children:
+            component_factor, task_factors = factors[component._component_id]
+
+            for task, task_factor in zip(component.children, task_factors):
+                results_sink.add(("Task", task._id, component._component_id, core._core_id, float(task_factor),
+                                  None))
+
+            results_sink.add(("Component", component._component_id, component._component_id, core._core_id,
+                              float(component_factor), min_speed_factor(core, component_factor)))
+
+        cores_results[core._core_id] = (core_factor, min_speed_factor(core, core_factor))
+        results_sink.add(("Core", core._core_id, None, core._core_id, float(core_factor),
+                          min_speed_factor(core, core_factor)))
+
+    results_sink.close()
+
+    return cores_results
+
+
+
+"""
+    Slowest speed_factor of a core that keeps a WCET scaling factor of 1, given
+    the scaling factor found for its current speed_factor (WCETs are divided
+    by the speed_factor). None if there is no such speed.
+"""
+def min_speed_factor(core, factor):
+    if factor == 0.0:
+        return None
+
+    return float(core._speed_factor / factor)
+
+
+
+"""
+    Add results to the results sink. Receive the sorted tasks, schedulable tasks,
     component and schedulable status of the component.
 
     >   Return:
         -   None
 """
-def write_results(sorted_tasks,schedulable_tasks,component,schedulable):
-    with open(ANALYSIS_OUTPUT, "a") as f:
-        for i, task in enumerate(sorted_tasks):
-            f.write(f"{task._id},{task._wcet:.4f},{int(task._priority)},{schedulable_tasks[i]},"
-                    f"{component._component_id},{schedulable}\n")
+def write_results(results_sink,sorted_tasks,schedulable_tasks,component,schedulable):
+    for i, task in enumerate(sorted_tasks):
+        results_sink.add((task._id, task._wcet, int(task._priority), bool(schedulable_tasks[i]),
+                          component._component_id, bool(schedulable)))
+
+
+"""
+    argparse type of --workers: a number of processes, or 0 for one per CPU.
+"""
+def workers_count(value):
+    try:
+        workers = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+
+    if workers < 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number of processes or 0, not {workers}")
+    return workers
 
 
 #   ------------------------------------------------------------------------------------
 #   Main function
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compositional schedulability analysis of the system.")
+    parser.add_argument("--workers", type=workers_count, default=1,
+                        help="number of worker processes analysing components in parallel "
+                             "(default: 1, 0 uses every CPU)")
+    parser.add_argument("--core-test", choices=CORE_TESTS, default="exact",
+                        help="core level test: exact response time/utilization test of the component "
+                             "servers, or the sufficient utilization bound (default: exact)")
+    parser.add_argument("--opa", action="store_true",
+                        help="assign optimal (Audsley) task priorities to the RM components "
+                             "that are unschedulable with the given ones")
+    parser.add_argument("--synthesize", action="store_true",
+                        help=f"also compute the minimal budget of every component and check it "
+                             f"against its core (written to {SYNTHESIS_OUTPUT})")
+    parser.add_argument("--sensitivity", action="store_true",
+                        help=f"also compute the largest WCET scaling factors and slowest speed factors "
+                             f"that keep the system schedulable (written to {SENSITIVITY_OUTPUT})")
+    parser.add_argument("--format", choices=RESULT_FORMATS, default="csv",
+                        help="format of the results files, written with the extension of the format "
+                             "(default: csv)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="don't read or write the cached model snapshots and component analysis results")
+    args = parser.parse_args()
+
+    #   Check the format before analysing anything (parquet needs pyarrow)
+    try:
+        ResultsSink(ANALYSIS_OUTPUT, ANALYSIS_COLUMNS, args.format)
+    except ImportError as e:
+        parser.error(str(e))
+
+    #   The model is loaded once and shared by every analysis
+    model = load_model(use_cache=not args.no_cache)
+
     #   Analyse the entire components distribution
-    schedulable, unschedulable_components, schedulable_components = analyse_system()
+    schedulable, unschedulable_components, schedulable_components, reassigned_components = \
+        analyse_system(model, workers=args.workers or None, optimal_priorities=args.opa,
+                       core_test=args.core_test, use_cache=not args.no_cache, results_format=args.format)
 
     #   Print results
     if schedulable:
@@ -102,3 +402,24 @@ if __name__ == "__main__":
     if schedulable_components:
         print("\nSchedulable components:\n", schedulable_components)
 
+    if reassigned_components:
+        print("\nComponents schedulable with reassigned task priorities:\n", reassigned_components)
+
+    #   Synthesize the minimal interfaces
+    if args.synthesize:
+        cores_results = synthesize_system(model, workers=args.workers or None, core_test=args.core_test,
+                                          results_format=args.format)
+
+        print("\nCore utilization with the minimal component budgets:")
+        for core_id, (utilization, core_schedulable) in cores_results.items():
+            print(f"  {core_id}: {utilization:.4f} ({'schedulable' if core_schedulable else 'not schedulable'})")
+
+    #   Sensitivity analysis
+    if args.sensitivity:
+        cores_results = sensitivity_system(model, workers=args.workers or None, core_test=args.core_test,
+                                           results_format=args.format)
+
+        print("\nLargest WCET scaling factor and slowest speed factor of each core:")
+        for core_id, (factor, speed_factor) in cores_results.items():
+            speed_factor = f"{speed_factor:.6f}" if speed_factor is not None else "-"
+            print(f"  {core_id}: {factor:.4f} (speed factor {speed_factor})")
@@ -0,0 +1,161 @@
+from source.generator import generate_system, generate_taskset, PERIOD_DISTRIBUTIONS
+from source.project_lib import load_model
+from source.simulator import run_parallel_simulation
+from main_analysis import analyse_system, workers_count
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+#   The exercise engines (RTA and VSS) live outside the project folder
+EXERCISE_CODE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Exercise Hand-In", "code")
+sys.path.insert(0, EXERCISE_CODE)
+import exercise as ex
+
+BENCHMARK_OUTPUT = "output/benchmark_results.jsonl"
+ENGINES = ("analysis", "simulation", "rta", "vss")
+
+
+"""
+    Runs a function `repeat` times with its standard output discarded, and
+    returns the wall time of each run in seconds.
+"""
+def time_engine(function, repeat: int):
+    times = []
+
+    for _ in range(repeat):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+
+    return times
+
+
+"""
+    Returns the git revision of the repository, or None if it isn't available.
+"""
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+"""
+    Generates the synthetic inputs in work_dir and times every selected engine on them.
+
+    >   Return:
+        -   Dictionary with one entry per engine holding the run times and their summary
+"""
+def run_benchmark(args, work_dir: str):
+    system_folder = os.path.join(work_dir, "input")
+    taskset_file = os.path.join(work_dir, "taskset.csv")
+
+    generate_system(system_folder, args.cores, args.components, args.tasks,
+                    args.utilization, args.task_load, args.period_min, args.period_max,
+                    args.periods, args.seed)
+    generate_taskset(taskset_file, args.tasks, args.utilization, args.period_min, args.period_max,
+                     args.periods, args.seed)
+
+    #   0 workers means one process per CPU
+    workers = args.workers or None
+
+    #   The model snapshots and analysis results aren't cached, so every run does the whole work
+    engines = {
+        "analysis": lambda: analyse_system(load_model(system_folder, use_cache=False), workers=workers,
+                                           use_cache=False),
+        "simulation": lambda: run_parallel_simulation(load_model(system_folder, use_cache=False), args.sim_time,
+                                                      workers),
+        "rta": lambda: ex.run_rta(taskset_file),
+        "vss": lambda: ex.run_vss(taskset_file, args.vss_time, 1.0),
+    }
+
+    results = {}
+    for engine in args.engines:
+        times = time_engine(engines[engine], args.repeat)
+        results[engine] = {
+            "times": times,
+            "min": min(times),
+            "median": statistics.median(times),
+        }
+        print(f"{engine:>10}: min {results[engine]['min']:.4f}s  median {results[engine]['median']:.4f}s")
+
+    return results
+
+
+#   ------------------------------------------------------------------------------------
+#   Main function
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the analysis and simulation engines "
+                                                 "on synthetic task sets.")
+    parser.add_argument("--cores", type=int, default=3, help="number of cores (default: 3)")
+    parser.add_argument("--components", type=int, default=3,
+                        help="components per core (default: 3)")
+    parser.add_argument("--tasks", type=int, default=10,
+                        help="tasks per component, and tasks of the RTA/VSS task set (default: 10)")
+    parser.add_argument("--utilization", type=float, default=0.7,
+                        help="utilization of each core and of the RTA/VSS task set (default: 0.7)")
+    parser.add_argument("--task-load", type=float, default=0.5,
+                        help="task utilization of a component relative to its budget (default: 0.5)")
+    parser.add_argument("--periods", choices=PERIOD_DISTRIBUTIONS, default="loguniform",
+                        help="period distribution (default: loguniform)")
+    parser.add_argument("--period-min", type=int, default=10, help="minimum period (default: 10)")
+    parser.add_argument("--period-max", type=int, default=1000, help="maximum period (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the generator (default: 0)")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES),
+                        help="engines to benchmark (default: all)")
+    parser.add_argument("--sim-time", type=float, default=10000.0,
+                        help="simulation time of the hierarchical simulator (default: 10000)")
+    parser.add_argument("--vss-time", type=int, default=10000,
+                        help="simulation time of the VSS, with time unit 1 (default: 10000)")
+    parser.add_argument("--workers", type=workers_count, default=1,
+                        help="worker processes for the analysis and the simulator (default: 1, 0 uses every CPU)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per engine (default: 3)")
+    parser.add_argument("--output", default=BENCHMARK_OUTPUT,
+                        help=f"JSON Lines file the results are appended to (default: {BENCHMARK_OUTPUT})")
+    parser.add_argument("--work-dir", default=None,
+                        help="folder for the generated inputs and engine outputs "
+                             "(default: a temporary folder)")
+    args = parser.parse_args()
+
+    output_file = os.path.abspath(args.output)
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+    with contextlib.ExitStack() as stack:
+        work_dir = args.work_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        work_dir = os.path.abspath(work_dir)
+        os.makedirs(os.path.join(work_dir, "output"), exist_ok=True)
+
+        #   The engines write their own result files relative to the working directory
+        previous_dir = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            results = run_benchmark(args, work_dir)
+        finally:
+            os.chdir(previous_dir)
+
+    record = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "work_dir")},
+        "results": results,
+    }
+
+    with open(output_file, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\nBenchmark results appended to {output_file}")
@@ -1,34 +1,35 @@
-from source.simulator import initialize_csv_data, run_simulation
-from source.simulator import component_task_exec_registry, components_registry
-from source.simulator import tasks_registry, cores_registry
-import os
-import csv
-import sys
+from source.project_lib import load_model
+from source.simulator import run_parallel_simulation
+from source.results import ResultsSink, RESULT_FORMATS
+from main_analysis import workers_count
+import argparse
 
 
-RESULTS_CSV_FILENAME = "output/results_simulator.csv"
+RESULTS_FILENAME = "output/results_simulator.csv"
+TRACE_FILENAME = "output/response_times_trace.csv"
+
+#   Response time quantiles estimated when requested with --quantiles
+QUANTILES = (0.99, 0.999)
 
 #   ------------------------------------------------------------------------------------
 #   Simulation Results Output
 #   ------------------------------------------------------------------------------------
 
-"""
-    Cleans the results CSV file for a new run.
-"""
-def delete_results_csv_file(filename=RESULTS_CSV_FILENAME):
-    file_exists = os.path.isfile(filename)
-
-    if file_exists:
-        os.remove(filename)
+#   Columns of the results file
+RESULTS_COLUMNS = (
+    'task_name', 'component_id', 'Core_id', 'task_schedulable',
+    'avg_response_time', 'max_response_time', 'component_schedulable',
+    'deadlines_missed', 'deadlines_met', 'min_response_time', 'std_response_time',
+    'p99_response_time', 'p999_response_time'
+)
 
 """
-    Calculates results and saves them to a CSV file.
+    Calculates results from the TaskExecution registry of the simulated cores of the model
+    and saves them to the results file (replacing the previous one) in the given format
+    (see results.ResultsSink).
 """
-def save_results_to_csv(filename=RESULTS_CSV_FILENAME):
-    #   Determine if the file exists to decide whether to write a header
-    file_exists = os.path.isfile(filename)
-
-    rows_to_write = []
+def save_results(model, component_task_exec_registry, filename=RESULTS_FILENAME, results_format="csv"):
+    results_sink = ResultsSink(filename, RESULTS_COLUMNS, results_format, index=('component_id',))
 
     #   Iterate through components to determine component_schedulable
     #   This requires iterating tasks per component first
@@ -49,28 +50,19 @@ def save_results_to_csv(filename=RESULTS_CSV_FILENAME):
                 break
         component_schedulability_map[comp_id] = all_tasks_in_comp_schedulable
 
-    #   Now prepare rows for CSV
+    #   Now prepare rows for the results file
     for comp_id, task_exec_list in component_task_exec_registry.items():
         #   Get the original Component object
-        component_obj = components_registry.get(comp_id)
+        component_obj = model.components.get(comp_id)
         if not component_obj:
-            print(f"Warning: Component {comp_id} not found in components_registry during results saving.")
+            print(f"Warning: Component {comp_id} not found in the model during results saving.")
             continue
 
-        #   Ensure this component actually ran on the target_core_id for which run_simulation was called
-        #   This check is a bit indirect here, as components are assigned to cores, and
-        #   component_task_exec_registry is global. A better way might be to pass the core's tasks
-        #   directly.
-        #   For now, we assume component_task_exec_registry is populated relevant to the last
-        #   run_simulation call.
-        #   If component_obj._core_id != target_core_id: --> This check assumes Component class has 
-        #   _core_id --> continue
-
         for task_exec in task_exec_list:
             #   Get original Task object for its name
-            task_obj = tasks_registry.get(task_exec.id)
+            task_obj = model.tasks.get(task_exec.id)
             if not task_obj:
-                print(f"Warning: Task {task_exec.id} not found in tasks_registry during results saving.")
+                print(f"Warning: Task {task_exec.id} not found in the model during results saving.")
                 #   Fallback to ID
                 task_name = task_exec.id
             else:
@@ -78,51 +70,74 @@ def save_results_to_csv(filename=RESULTS_CSV_FILENAME):
 
             task_schedulable_by_sim = True if task_exec.deadlines_missed == 0 else False
             
+            stats = task_exec.response_stats
             avg_response_time = 0.0
             max_response_time = 0.0
-            if task_exec.response_times:
-                avg_response_time = sum(task_exec.response_times) / len(task_exec.response_times)
-                max_response_time = max(task_exec.response_times)
+            min_response_time = 0.0
+            if stats.count:
+                avg_response_time = stats.mean
+                max_response_time = stats.max
+                min_response_time = stats.min
+
+            #   Quantiles are only available when they were estimated during the simulation
+            p99_response_time = stats.quantile(0.99)
+            p999_response_time = stats.quantile(0.999)
 
             component_schedulable = True if component_schedulability_map.get(comp_id, False) else False
-            core_obj = cores_registry.get(component_obj._core_id)
-
-            rows_to_write.append({
-                'task_name': task_name,
-                'component_id': comp_id,
-
-                #   Use the core_id for which simulation was run
-                'Core_id': core_obj._core_id,
-                'task_schedulable': task_schedulable_by_sim,
-                'avg_response_time': f"{avg_response_time:.4f}",
-                'max_response_time': f"{max_response_time:.4f}",
-                'component_schedulable': component_schedulable,
-                'deadlines_missed': task_exec.deadlines_missed,
-                'deadlines_met': task_exec.deadlines_met
-            })
-
-    if not rows_to_write:
-        print(f"No results to write for core {core_obj._core_id}.")
+            core_obj = model.cores.get(component_obj._core_id)
+
+            #   Quantiles without estimates are left empty
+            results_sink.add((
+                task_name,
+                comp_id,
+
+                #   Use the core_id on which the component was simulated
+                core_obj._core_id,
+                task_schedulable_by_sim,
+                float(avg_response_time),
+                float(max_response_time),
+                component_schedulable,
+                task_exec.deadlines_missed,
+                task_exec.deadlines_met,
+                float(min_response_time),
+                stats.std(),
+                p99_response_time,
+                p999_response_time
+            ))
+
+    if not results_sink.rows:
+        print("No results to write.")
         return
 
     try:
-        with open(filename, 'a' if file_exists else 'w', newline='') as csvfile:
-            fieldnames = [
-                'task_name', 'component_id', 'Core_id', 'task_schedulable',
-                'avg_response_time', 'max_response_time', 'component_schedulable',
-                'deadlines_missed', 'deadlines_met'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-            if not file_exists:
-                writer.writeheader()
-            
-            for row in rows_to_write:
-                writer.writerow(row)
-        print(f"Results for core {core_obj._core_id}\
-              {'appended to ' if file_exists else 'written to '}{filename}")
+        results_sink.close()
+        print(f"Results written to {results_sink.file_name}")
+    except IOError:
+        print(f"Error: Could not write to file {results_sink.file_name}")
+
+
+
+#   Columns of the trace file
+TRACE_COLUMNS = ('task_name', 'component_id', 'completion_time', 'response_time')
+
+"""
+    Saves the full trace of response times of every task to the trace file in the given
+    format (see results.ResultsSink). Only available when the simulation was run with
+    keep_trace.
+"""
+def save_trace(component_task_exec_registry, filename=TRACE_FILENAME, results_format="csv"):
+    results_sink = ResultsSink(filename, TRACE_COLUMNS, results_format, index=('task_name',))
+
+    for comp_id, task_exec_list in component_task_exec_registry.items():
+        for task_exec in task_exec_list:
+            for completion_time, response_time in task_exec.response_stats.trace or []:
+                results_sink.add((task_exec.id, comp_id, float(completion_time), float(response_time)))
+
+    try:
+        results_sink.close()
+        print(f"Response time trace written to {results_sink.file_name}")
     except IOError:
-        print(f"Error: Could not write to file {filename}")
+        print(f"Error: Could not write to file {results_sink.file_name}")
 
 
 
@@ -133,24 +148,38 @@ def save_results_to_csv(filename=RESULTS_CSV_FILENAME):
 
 if __name__ == "__main__":
 
-    if len(sys.argv) < 2:
-        print("Usage: python main_simulator.py <simulation_time>")
-        sys.exit(1)
-    
+    parser = argparse.ArgumentParser(description="Hierarchical scheduling simulator.")
+    parser.add_argument("simulation_time", type=float, help="simulation time")
+    parser.add_argument("--workers", type=workers_count, default=0,
+                        help="number of worker processes simulating cores in parallel "
+                             "(default: 0, one per core; 1 runs the cores serially)")
+    parser.add_argument("--quantiles", action="store_true",
+                        help="estimate the p99 and p99.9 response times of every task")
+    parser.add_argument("--format", choices=RESULT_FORMATS, default="csv",
+                        help="format of the results and trace files, written with the extension of the "
+                             "format (default: csv)")
+    parser.add_argument("--trace", action="store_true",
+                        help=f"keep every response time and write them to {TRACE_FILENAME}")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="don't read or write the cached model snapshots")
+    args = parser.parse_args()
+
+    #   Check the format before simulating anything (parquet needs pyarrow)
     try:
-        sim_time = float(sys.argv[1])
-    except ValueError:
-        print("Error: Simulation time must be a number.")
-        sys.exit(1)
+        ResultsSink(RESULTS_FILENAME, RESULTS_COLUMNS, args.format)
+    except ImportError as e:
+        parser.error(str(e))
 
     # --- Initialize data using the library ---
     print("Initializing data from CSV files...")
-    initialize_csv_data()
+    model = load_model(use_cache=not args.no_cache)
     print("Data initialization complete.")
 
-    #delete the results csv file from previous run
-    delete_results_csv_file()
+    #   Every core is independent, so they are simulated in parallel and merged afterwards
+    component_task_exec_registry = run_parallel_simulation(model, args.simulation_time, args.workers or None,
+                                                           QUANTILES if args.quantiles else (),
+                                                           args.trace)
+    save_results(model, component_task_exec_registry, results_format=args.format)
 
-    for core in cores_registry:
-        run_simulation(core, sim_time)
-        save_results_to_csv()
\ No newline at end of file
+    if args.trace:
+        save_trace(component_task_exec_registry, results_format=args.format)
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from source.project_lib import *
 
 
@@ -40,6 +41,291 @@ def dbf_task_RM(sorted_tasks, task : Task, t_interval : float):
 
 
 
+#   ------------------------------------------------------------------------------------------------------
+#   Vectorized demand/supply bound kernel
+#   ------------------------------------------------------------------------------------------------------
+
+#   Maximum number of (time instant, task) pairs evaluated in a single NumPy pass. Longer curves
+#   are computed in blocks of this size so memory stays bounded for large task sets.
+KERNEL_BLOCK_SIZE = 1 << 20
+
+
+"""
+    Builds the arrays used by the kernel from a list of tasks.
+
+    >   Return:
+        -   Tuple of arrays (periods, wcets, deadlines, priorities)
+"""
+def task_arrays(tasks):
+    periods = np.array([task._period for task in tasks], dtype=float)
+    wcets = np.array([task._wcet for task in tasks], dtype=float)
+    deadlines = np.array([task._deadline for task in tasks], dtype=float)
+    priorities = np.array([task._priority for task in tasks], dtype=float)
+
+    return periods, wcets, deadlines, priorities
+
+
+
+"""
+    Plain parameters of a component for the array based analyses: unlike the
+    Component, whose parent links back to its whole core, they are cheap to
+    send to a worker process.
+
+    >   Return:
+        -   Tuple (scheduler, alfa, delta, periods, wcets, deadlines,
+            priorities) with the BDR interface of the component (alfa and
+            delta are None if it has none) and the arrays of its tasks, in
+            their order (see task_arrays)
+"""
+def component_arrays(component):
+    alfa, delta = None, None
+    if component._interface is not None:
+        alfa, delta = component._interface._av_factor, component._interface._part_delay
+
+    return (component._scheduler, alfa, delta) + task_arrays(component.children)
+
+
+
+"""
+    Supply bound function of a BDR interface (alfa, delta) for an array
+    of interval lengths.
+"""
+def sbf_curve(alfa : float, delta : float, t_intervals):
+    t_intervals = np.asarray(t_intervals, dtype=float)
+    return np.where(t_intervals >= delta, alfa * (t_intervals - delta), 0.0)
+
+
+
+"""
+    Demand bound function of a task set scheduled by EDF for an array of
+    interval lengths:
+        dbf(t) = sum(floor((t + T - D) / T) * C)
+"""
+def dbf_curve_EDF(periods, wcets, deadlines, t_intervals):
+    t_intervals = np.asarray(t_intervals, dtype=float)
+    dbf_values = np.empty(len(t_intervals))
+    block = max(1, KERNEL_BLOCK_SIZE // max(1, len(periods)))
+
+    for start in range(0, len(t_intervals), block):
+        t_block = t_intervals[start:start + block, None]
+        jobs = np.floor((t_block + periods - deadlines) / periods)
+        dbf_values[start:start + block] = jobs @ wcets
+
+    return dbf_values
+
+
+
+"""
+    Demand bound function of a task under fixed priorities for an array of
+    interval lengths, given the periods and wcets of its higher priority tasks:
+        dbf(t) = C + sum(ceil(t / T_hp) * C_hp)
+"""
+def dbf_curve_RM(hp_periods, hp_wcets, wcet : float, t_intervals):
+    t_intervals = np.asarray(t_intervals, dtype=float)
+    dbf_values = np.full(len(t_intervals), wcet, dtype=float)
+    block = max(1, KERNEL_BLOCK_SIZE // max(1, len(hp_periods)))
+
+    for start in range(0, len(t_intervals), block):
+        t_block = t_intervals[start:start + block, None]
+        dbf_values[start:start + block] += np.ceil(t_block / hp_periods) @ hp_wcets
+
+    return dbf_values
+
+
+
+"""
+    Scheduling points of a task under fixed priorities: the multiples of the
+    higher priority periods up to the deadline, plus the deadline itself. The
+    dbf only changes right after these points while the sbf keeps increasing,
+    so they are the only instants worth testing.
+"""
+def scheduling_points_RM(hp_periods, deadline : float):
+    counts = np.floor(deadline / hp_periods).astype(np.int64)
+    multiples = np.repeat(hp_periods, counts) * _ranges(counts)
+
+    return np.unique(np.append(multiples, deadline))
+
+
+
+"""
+    Absolute deadlines of a task set (synchronous release at time 0) inside
+    the interval (lower, upper]. These are the points where the EDF dbf changes.
+"""
+def deadline_points_EDF(periods, deadlines, lower : float, upper : float):
+    first = np.maximum(np.floor((lower - deadlines) / periods) + 1, 0)
+    last = np.floor((upper - deadlines) / periods)
+    counts = np.maximum(last - first + 1, 0).astype(np.int64)
+
+    jobs = np.repeat(first, counts) + _ranges(counts) - 1
+    points = jobs * np.repeat(periods, counts) + np.repeat(deadlines, counts)
+
+    return np.unique(points)
+
+
+
+"""
+    For an array of counts, returns the concatenation of 1..count for each of them.
+"""
+def _ranges(counts):
+    total = int(counts.sum())
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+
+    return np.arange(1, total + 1) - offsets
+
+
+
+"""
+    Hyperperiod of a task set (least common multiple of the periods).
+"""
+def hyperperiod(periods):
+    value = 1
+    for period in periods:
+        value = math.lcm(value, int(period))
+
+    return float(value)
+
+
+
+"""
+    Largest interval length that needs to be tested for a task set scheduled
+    by EDF under a BDR interface (alfa, delta).
+
+    For constrained deadlines dbf(t) <= U*t + sum((T - D)*U_i), so once this
+    line falls below sbf(t) = alfa*(t - delta) no deadline can be missed:
+        L = (alfa*delta + sum((T - D)*U_i)) / (alfa - U)
+    The demand pattern repeats every hyperperiod, so the hyperperiod is always
+    an upper limit (and the only one available when U >= alfa).
+"""
+def testing_bound_EDF(periods, wcets, deadlines, alfa : float, delta : float):
+    limit = hyperperiod(periods)
+    utilization = float(np.sum(wcets / periods))
+
+    if utilization >= alfa:
+        return limit
+
+    slack = float(np.sum((periods - deadlines) * wcets / periods))
+    return min(limit, (alfa * delta + slack) / (alfa - utilization))
+
+
+
+"""
+    Schedulability of every task of a fixed priority task set under a BDR
+    interface (alfa, delta). A task is schedulable if dbf <= sbf at one of its
+    scheduling points. Tasks with a lower priority value have higher priority.
+
+    >   Return:
+        -   Boolean array with the schedulability of each task
+"""
+def schedulable_tasks_RM(periods, wcets, deadlines, priorities, alfa : float, delta : float):
+    schedulable_tasks = np.zeros(len(periods), dtype=bool)
+
+    for i in range(len(periods)):
+        hp_mask = priorities < priorities[i]
+        t_intervals = scheduling_points_RM(periods[hp_mask], deadlines[i])
+
+        dbf_values = dbf_curve_RM(periods[hp_mask], wcets[hp_mask], wcets[i], t_intervals)
+        schedulable_tasks[i] = np.any(dbf_values <= sbf_curve(alfa, delta, t_intervals))
+
+    return schedulable_tasks
+
+
+
+"""
+    Audsley's optimal priority assignment for a fixed priority task set under
+    a BDR interface (alfa, delta). From the lowest priority level up, assigns
+    to each level a task that is schedulable with every still unassigned task
+    above it, which finds a feasible assignment if any exists with n^2 tests at
+    most. Candidates are tried from the lowest given priority, so a feasible
+    given assignment is kept.
+
+    The test of a task only depends on the set of its higher priority tasks,
+    which only shrinks from one level to the next. Each candidate caches its
+    scheduling points (those of every other task, a superset of the points
+    needed later, and any instant up to the deadline is a valid test point)
+    and its dbf at them, and assigning a task just subtracts its demand from
+    the cached dbf of the rest.
+
+    >   Return:
+        -   Indices of the tasks from the highest to the lowest priority, or
+            None if no priority assignment makes the task set schedulable
+"""
+def optimal_priorities_RM(periods, wcets, deadlines, priorities, alfa : float, delta : float):
+    candidates = [int(i) for i in np.argsort(priorities, kind="stable")[::-1]]
+
+    t_intervals = {}
+    dbf_values = {}
+    sbf_values = {}
+    for i in candidates:
+        others = np.arange(len(periods)) != i
+        t_intervals[i] = scheduling_points_RM(periods[others], deadlines[i])
+        dbf_values[i] = dbf_curve_RM(periods[others], wcets[others], wcets[i], t_intervals[i])
+        sbf_values[i] = sbf_curve(alfa, delta, t_intervals[i])
+
+    assigned = []
+    while candidates:
+        chosen = next((i for i in candidates if np.any(dbf_values[i] <= sbf_values[i])), None)
+
+        if chosen is None:
+            return None
+
+        candidates.remove(chosen)
+        assigned.append(chosen)
+
+        #   The chosen task no longer interferes with the unassigned ones
+        for i in candidates:
+            dbf_values[i] -= np.ceil(t_intervals[i] / periods[chosen]) * wcets[chosen]
+
+    return assigned[::-1]
+
+
+
+"""
+    Schedulability of a task set scheduled by EDF under a BDR interface
+    (alfa, delta).
+
+    Deadlines up to testing_bound_EDF are checked in windows, from the bound
+    backwards, each window in a single kernel pass. Like QPA, the search then
+    skips every interval already covered by a passed check: if dbf(t) <= sbf(t),
+    any t' between sbf^-1(dbf(t)) = delta + dbf(t)/alfa and t is also safe.
+
+    >   Return:
+        -   True:   Task set is schedulable
+        -   False:  Task set is not schedulable
+"""
+def schedulable_EDF(periods, wcets, deadlines, alfa : float, delta : float):
+    if len(periods) == 0:
+        return True
+
+    #   Window width holding about one kernel block worth of deadlines
+    window_points = max(1, KERNEL_BLOCK_SIZE // len(periods))
+    window = window_points / float(np.sum(1.0 / periods))
+
+    upper = testing_bound_EDF(periods, wcets, deadlines, alfa, delta)
+    while upper > 0.0:
+        lower = upper - window
+        t_intervals = deadline_points_EDF(periods, deadlines, lower, upper)
+
+        if len(t_intervals) > 0:
+            dbf_values = dbf_curve_EDF(periods, wcets, deadlines, t_intervals)
+
+            if np.any(dbf_values > sbf_curve(alfa, delta, t_intervals)):
+                return False
+
+            #   Every interval between sbf^-1(dbf) and a checked point is covered
+            if alfa > 0.0:
+                covered = np.minimum(t_intervals, delta + dbf_values / alfa)
+                lower = min(lower, float(covered.min()))
+
+        upper = lower
+
+    return True
+
+
+
+#   ------------------------------------------------------------------------------------------------------
+#   Component analysis
+#   ------------------------------------------------------------------------------------------------------
+
 """
     Demand bound function for a component which has RM as
     scheduling algorithm.
@@ -52,28 +338,36 @@ def dbf_task_RM(sorted_tasks, task : Task, t_interval : float):
             -   Array of schedulable/unschedulable tasks
 """
 def dbf_component_RM(component : Component):
-    schedulable = True
-    
     sorted_tasks = sorted(component.children, key=lambda _task: _task._priority, reverse=False)
-    schedulable_tasks = [False] * len(sorted_tasks)
+    periods, wcets, deadlines, priorities = task_arrays(sorted_tasks)
 
-    for i, task in enumerate(sorted_tasks):
-        t_interval = 0.0
+    schedulable_tasks = schedulable_tasks_RM(periods, wcets, deadlines, priorities,
+                                             component._interface._av_factor,
+                                             component._interface._part_delay)
 
-        while t_interval <= task._period and (schedulable_tasks[i] == False):
-            dbf_task = dbf_task_RM(sorted_tasks, task, t_interval)
+    return bool(schedulable_tasks.all()), schedulable_tasks.tolist()
 
-            if dbf_task <= sbf_component(component, t_interval):
-                schedulable_tasks[i] = True
 
-            t_interval += 1
 
-    for i in range(len(schedulable_tasks)):
-        if schedulable_tasks[i] == False:
-            schedulable = False
-            break
+"""
+    Optimal (Audsley) priority assignment for the tasks of a component which
+    has RM as scheduling algorithm, under its BDR interface.
 
-    return schedulable, schedulable_tasks
+    >   Return:
+        -   Tasks of the component from the highest to the lowest priority,
+            or None if no priority assignment makes the component schedulable
+"""
+def optimal_priorities_component_RM(component : Component):
+    periods, wcets, deadlines, priorities = task_arrays(component.children)
+
+    order = optimal_priorities_RM(periods, wcets, deadlines, priorities,
+                                  component._interface._av_factor,
+                                  component._interface._part_delay)
+
+    if order is None:
+        return None
+
+    return [component.children[i] for i in order]
 
 
 
@@ -87,45 +381,428 @@ def dbf_component_RM(component : Component):
             -   False:  Component is not schedulable
 """
 def dbf_component_EDF(component : Component):
-    schedulable = True
-
-    #   Calculate the hyperperiod of the task set (maximum resource demand
-    #   in the task set cycle)
-    def calculate_hyperperiod(tasks):
-        def gcd(a, b):
-            while b:
-                a, b = b, a % b
-            return a
-
-        def lcm(a, b):
-            return abs(a * b) // gcd(a, b) if a and b else 0
+    periods, wcets, deadlines, _ = task_arrays(component.children)
 
-        hyperperiod = tasks[0]._period
-        for i in range(1, len(tasks)):
-            hyperperiod = lcm(hyperperiod, tasks[i]._period)
+    schedulable = schedulable_EDF(periods, wcets, deadlines,
+                                  component._interface._av_factor,
+                                  component._interface._part_delay)
 
-        return float(hyperperiod)
-    
-    
-    task_set = component.children
-    hyperperiod = calculate_hyperperiod(task_set)
-    
-    t_interval = 0.0
-    while t_interval <= hyperperiod:
-        dbf_edf = 0.0
-        for task in task_set:
-            dbf_edf += math.floor((t_interval + task._period - task._deadline)/task._period) * task._wcet
-
-        if dbf_edf > sbf_component(component, t_interval):
-            schedulable = False
-            break
-
-        t_interval += 1
-        
     schedulable_tasks = [schedulable] * len(component.children)
     return schedulable, schedulable_tasks
 
 
+"""
+    Runs the schedulability analysis of a single component according to its
+    scheduler (see analyse_component_arrays).
+"""
+def analyse_component(component : Component):
+    return analyse_component_arrays(*component_arrays(component))
+
+
+
+"""
+    Schedulability analysis of a component from its plain parameters (see
+    component_arrays), so it can be executed in a worker process. Gives the
+    same results as dbf_component_RM and dbf_component_EDF.
+
+    >   Return:
+        (1)
+            -   True:   Component is schedulable
+            -   False:  Component is not schedulable
+        (2)
+            -   Array of schedulable/unschedulable tasks, sorted by priority
+                on RM components
+"""
+def analyse_component_arrays(scheduler : Scheduler, alfa : float, delta : float,
+                             periods, wcets, deadlines, priorities):
+    if scheduler == Scheduler.RM:
+        #   Same order as the sorted tasks of dbf_component_RM (both sorts are stable)
+        order = np.argsort(priorities, kind="stable")
+        schedulable_tasks = schedulable_tasks_RM(periods, wcets, deadlines, priorities, alfa, delta)[order]
+
+        return bool(schedulable_tasks.all()), schedulable_tasks.tolist()
+    elif scheduler == Scheduler.EDF:
+        schedulable = schedulable_EDF(periods, wcets, deadlines, alfa, delta)
+
+        return schedulable, [schedulable] * len(periods)
+
+
+#   ------------------------------------------------------------------------------------------------------
+#   Core analysis
+#   ------------------------------------------------------------------------------------------------------
+
+#   Core level tests: the sufficient utilization bound of Core.simple_scheduler, or the exact test
+CORE_TESTS = ("bound", "exact")
+
+
+"""
+    Response times of periodic servers (budget every period) scheduled by
+    fixed priorities on a dedicated core, from the response time analysis
+    R = Q + sum(ceil(R / P_hp) * Q_hp). Servers with a lower priority value
+    have higher priority.
+
+    >   Return:
+        -   Array with the response time of each server (inf when it
+            exceeds the period)
+"""
+def server_response_times_RM(budgets, periods, priorities):
+    response_times = np.full(len(budgets), math.inf)
+
+    for i in range(len(budgets)):
+        hp_mask = priorities < priorities[i]
+        hp_budgets = budgets[hp_mask]
+        hp_periods = periods[hp_mask]
+
+        response_time = budgets[i]
+        while response_time <= periods[i]:
+            next_response_time = budgets[i] + float(np.ceil(response_time / hp_periods) @ hp_budgets)
+
+            if next_response_time <= response_time:
+                response_times[i] = response_time
+                break
+
+            response_time = next_response_time
+
+    return response_times
+
+
+
+"""
+    Schedulability of the components of a core, seen as periodic servers that
+    provide their budget every period.
+        - bound: utilization within Core.utilization_bound (Liu & Layland bound
+        for RM), which is sufficient but pessimistic for RM.
+        - exact: EDF cores need a utilization of at most 1, RM cores a response
+        time within the period for every server. Servers are prioritized by
+        the component priorities of budgets.csv if all of them are set, and
+        rate monotonically (by period) otherwise.
+
+    >   Parameters:
+        - core: core instance
+        - core_test: "bound" or "exact"
+        - budgets: dictionary with the budget of each component id, to test
+        budgets other than the components' own (e.g. the synthesized ones)
+    >   Return:
+        -   True:   Core components are schedulable
+        -   False:  Core components are not schedulable
+"""
+def schedulable_core(core : Core, core_test : str = "exact", budgets = None):
+    components = core.root_comp.children
+
+    if not components:
+        return True
+
+    periods = np.array([component._period for component in components], dtype=float)
+    budget_values = np.array([component._budget if budgets is None else budgets[component._component_id]
+                              for component in components], dtype=float)
+    utilization = float(np.sum(budget_values / periods))
+
+    if core_test == "bound":
+        return utilization <= core.utilization_bound()
+
+    if core._scheduler == Scheduler.EDF:
+        return utilization <= 1.0
+
+    priorities = np.array([component._priority for component in components], dtype=float)
+    if not np.all(np.isfinite(priorities) & (priorities >= 0)):
+        priorities = periods
+
+    #   Servers with equal priorities still delay each other, ties are broken by component order
+    ranks = np.argsort(np.argsort(priorities, kind="stable"), kind="stable")
+
+    response_times = server_response_times_RM(budget_values, periods, ranks)
+    return bool(np.all(response_times <= periods))
+
+
+
+#   ------------------------------------------------------------------------------------------------------
+#   Interface synthesis
+#   ------------------------------------------------------------------------------------------------------
+
+#   Precision of the minimal budgets found by bisection, relative to the component period
+SYNTHESIS_TOLERANCE = 1e-6
+
+
+"""
+    BDR interface (alfa, delta) given by the half-half algorithm to a budget
+    Q every period P: alfa = Q/P, delta = 2(P - Q).
+"""
+def half_half_interface(budget : float, period : float):
+    return budget / period, 2.0 * (period - budget)
+
+
+
+"""
+    Minimum availability factor of a half-half interface with period P that
+    keeps a fixed priority task set schedulable.
+
+    With delta = 2P(1 - alfa), dbf(t) <= alfa*(t - delta) at a scheduling point
+    t is the quadratic condition 2P*alfa^2 + (t - 2P)*alfa - dbf(t) >= 0, which
+    holds from its positive root on. Each task needs the smallest root among its
+    scheduling points, and the task set the largest of those.
+
+    >   Return:
+        -   Minimum alfa (above 1 if the task set can't be scheduled even with a
+            dedicated resource)
+"""
+def minimal_alfa_RM(periods, wcets, deadlines, priorities, period : float):
+    alfa = 0.0
+
+    for i in range(len(periods)):
+        hp_mask = priorities < priorities[i]
+        t_intervals = scheduling_points_RM(periods[hp_mask], deadlines[i])
+        dbf_values = dbf_curve_RM(periods[hp_mask], wcets[hp_mask], wcets[i], t_intervals)
+
+        b = t_intervals - 2.0 * period
+        roots = (np.sqrt(b * b + 8.0 * period * dbf_values) - b) / (4.0 * period)
+        alfa = max(alfa, float(roots.min()))
+
+    return alfa
+
+
+
+"""
+    Minimum budget of a component with its period P (half-half interface) that
+    keeps its tasks schedulable (see minimal_budget_arrays).
+
+    >   Return:
+        -   Minimum budget, or None if the component is not schedulable even
+            with a budget equal to its period
+"""
+def minimal_budget_component(component : Component):
+    return minimal_budget_arrays(component._scheduler, component._period, *task_arrays(component.children))
+
+
+
+"""
+    Minimum budget with period P (half-half interface) that keeps a task set
+    schedulable by the given scheduler. RM task sets use the closed form of
+    minimal_alfa_RM, EDF task sets a bisection between their utilization and
+    the full period, since a larger budget never reduces the supply. The result
+    is confirmed with the regular tests, so it is never below the exact minimum.
+    Only takes plain values and arrays, so it can be executed in a worker
+    process.
+
+    >   Return:
+        -   Minimum budget, or None if the task set is not schedulable even
+            with a budget equal to the period
+"""
+def minimal_budget_arrays(scheduler : Scheduler, period : float, periods, wcets, deadlines, priorities):
+    if scheduler == Scheduler.RM:
+        def schedulable(budget):
+            return bool(schedulable_tasks_RM(periods, wcets, deadlines, priorities,
+                                             *half_half_interface(budget, period)).all())
+
+        budget = min(period, minimal_alfa_RM(periods, wcets, deadlines, priorities, period) * period)
+    else:
+        def schedulable(budget):
+            return schedulable_EDF(periods, wcets, deadlines, *half_half_interface(budget, period))
+
+        budget = None
+        if schedulable(period):
+            #   The budget can't be below the utilization of the tasks
+            low = min(period, float(np.sum(wcets / periods)) * period)
+            high = period
+
+            while high - low > SYNTHESIS_TOLERANCE * period:
+                middle = (low + high) / 2.0
+                if schedulable(middle):
+                    high = middle
+                else:
+                    low = middle
+
+            budget = high
+
+    if budget is None:
+        return None
+
+    #   Round up the floating point error of the closed form
+    tolerance = SYNTHESIS_TOLERANCE * period
+    while not schedulable(budget):
+        if budget >= period:
+            return None
+        budget = min(period, budget + tolerance)
+
+    return budget
+
+
+
+"""
+    Synthesizes the minimal interface of every component of a core, and
+    propagates their demand to the core: the core must schedule the minimal
+    budgets under the given core test (see schedulable_core).
+
+    >   Return:
+        (1)
+            -   Dictionary with the minimal budget of each component id
+                (None if the component is not schedulable with any budget)
+        (2)
+            -   Utilization demanded by the minimal budgets
+        (3)
+            -   True:   Core can provide the minimal budgets
+            -   False:  Core can't provide the minimal budgets
+"""
+def synthesize_core(core : Core, minimal_budgets = None, core_test : str = "exact"):
+    components = core.root_comp.children
+
+    if minimal_budgets is None:
+        minimal_budgets = {component._component_id: minimal_budget_component(component)
+                           for component in components}
+
+    utilization = 0.0
+    feasible = True
+    for component in components:
+        budget = minimal_budgets[component._component_id]
+
+        if budget is None:
+            feasible = False
+        else:
+            utilization += budget / component._period
+
+    return minimal_budgets, utilization, feasible and schedulable_core(core, core_test, minimal_budgets)
+
+
+#   ------------------------------------------------------------------------------------------------------
+#   Sensitivity analysis
+#   ------------------------------------------------------------------------------------------------------
+
+"""
+    Demand of the tasks of a component under its BDR interface, cached to find
+    the largest factor the WCETs of any subset of its tasks can be scaled by
+    while the component stays schedulable. Built from the plain parameters of
+    the component (see component_arrays).
+
+    RM: the dbf of a task at each of its scheduling points is linear in the
+    WCETs, dbf(t) = counts(t) . C, where counts(t) holds ceil(t/T_j) for its
+    higher priority tasks and 1 for itself. The scheduling points, the counts
+    and the sbf only depend on the periods and the interface, so they are
+    computed once. Scaling a subset S of the WCETs by k gives
+    dbf(t) = a(t) + k*b(t), which passes at t for any k up to
+    (sbf(t) - a(t)) / b(t): the largest factor is found in closed form.
+
+    EDF: the testing bound depends on the utilization, so the factor is found
+    by bisection with schedulable_EDF on the cached arrays, up to the factor
+    where the utilization reaches alfa.
+"""
+class ComponentDemand:
+
+    __slots__ = ('_scheduler', '_alfa', '_delta', '_periods', '_wcets', '_deadlines', '_curves')
+
+    #   Precision of the factors found by bisection (relative)
+    TOLERANCE = 1e-6
+
+    def __init__(self, scheduler : Scheduler, alfa : float, delta : float, periods, wcets, deadlines, priorities):
+        self._scheduler = scheduler
+        self._alfa = alfa
+        self._delta = delta
+        self._periods, self._wcets, self._deadlines = periods, wcets, deadlines
+
+        #   Scheduling points, demand counts and supply of each task (RM)
+        self._curves = []
+        if self._scheduler == Scheduler.RM:
+            for i in range(len(self._periods)):
+                hp_mask = priorities < priorities[i]
+                t_intervals = scheduling_points_RM(self._periods[hp_mask], self._deadlines[i])
+
+                counts = np.where(hp_mask, np.ceil(t_intervals[:, None] / self._periods), 0.0)
+                counts[:, i] = 1.0
+                self._curves.append((counts, sbf_curve(self._alfa, self._delta, t_intervals)))
+
+    """
+        Largest factor the WCETs of the tasks selected by scaled_mask (boolean
+        array) can be multiplied by with the component still schedulable.
+
+        >   Return:
+            -   Scaling factor (0 if the component isn't schedulable even
+                without those WCETs, inf if they can grow without limit)
+    """
+    def max_scaling(self, scaled_mask):
+        scaled_mask = np.asarray(scaled_mask, dtype=bool)
+
+        if self._scheduler == Scheduler.RM:
+            return self._max_scaling_RM(scaled_mask)
+
+        return self._max_scaling_EDF(scaled_mask)
+
+    def _max_scaling_RM(self, scaled_mask):
+        fixed_wcets = np.where(scaled_mask, 0.0, self._wcets)
+        scaled_wcets = np.where(scaled_mask, self._wcets, 0.0)
+        factor = math.inf
+
+        for counts, sbf_values in self._curves:
+            fixed = counts @ fixed_wcets
+            scaled = counts @ scaled_wcets
+            slack = sbf_values - fixed
+
+            #   Largest factor passing at each scheduling point (-inf where none does)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                limits = np.where(scaled > 0.0, slack / scaled, np.where(slack >= 0.0, math.inf, -math.inf))
+
+            factor = min(factor, float(limits.max()))
+
+        return max(factor, 0.0)
+
+    def _max_scaling_EDF(self, scaled_mask):
+        def schedulable(factor):
+            wcets = np.where(scaled_mask, self._wcets * factor, self._wcets)
+            return schedulable_EDF(self._periods, wcets, self._deadlines, self._alfa, self._delta)
+
+        scaled_utilization = float(np.sum(np.where(scaled_mask, self._wcets, 0.0) / self._periods))
+        fixed_utilization = float(np.sum(np.where(scaled_mask, 0.0, self._wcets) / self._periods))
+
+        if scaled_utilization == 0.0:
+            return math.inf if schedulable(1.0) else 0.0
+
+        #   The utilization of the tasks can't exceed alfa
+        high = (self._alfa - fixed_utilization) / scaled_utilization
+        if high <= 0.0 or not schedulable(0.0):
+            return 0.0
+
+        low = 0.0
+        while high - low > self.TOLERANCE * max(high, 1.0):
+            middle = (low + high) / 2.0
+            if schedulable(middle):
+                low = middle
+            else:
+                high = middle
+
+        return low
+
+
+
+"""
+    WCET sensitivity of a component: the largest factor all the WCETs of its
+    tasks can be scaled by, and the largest factor each task's WCET can be
+    scaled by on its own, with the component still schedulable (see
+    sensitivity_arrays).
+"""
+def sensitivity_component(component : Component):
+    return sensitivity_arrays(*component_arrays(component))
+
+
+
+"""
+    WCET sensitivity of a component from its plain parameters (see
+    component_arrays), so it can be executed in a worker process.
+
+    >   Return:
+        (1)
+            -   Scaling factor of the component
+        (2)
+            -   Array with the scaling factor of each task
+"""
+def sensitivity_arrays(scheduler : Scheduler, alfa : float, delta : float, periods, wcets, deadlines, priorities):
+    n = len(periods)
+
+    if alfa is None or n == 0:
+        return math.inf, [math.inf] * n
+
+    demand = ComponentDemand(scheduler, alfa, delta, periods, wcets, deadlines, priorities)
+    task_factors = [demand.max_scaling(np.arange(n) == i) for i in range(n)]
+
+    return demand.max_scaling(np.ones(n, dtype=bool)), task_factors
+
+
 #   [...]
 #   Half-half algorithm implemented inside Component class (see project_types.py)
 
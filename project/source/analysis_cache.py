@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from source.project_lib import Component
+
+
+#   ------------------------------------------------------------------------------------
+#   Persistent cache of component analysis results
+#   ------------------------------------------------------------------------------------
+
+#   Database of the cached results, and how many results are kept
+ANALYSIS_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "analysis.sqlite")
+ANALYSIS_CACHE_SIZE = 100000
+
+#   Part of the key of every result, must be changed whenever the component analysis changes
+ANALYSIS_CACHE_VERSION = 1
+
+#   Keys looked up per query (SQLite limits the number of parameters of a statement)
+_QUERY_SIZE = 500
+
+
+"""
+    Canonical hash of everything the analysis of a component depends on: its
+    scheduler and interface (budget and period), the speed factor of its core,
+    and the parameters of its tasks in the order they were loaded. Task names
+    aren't part of it, so renaming tasks keeps the cached results.
+"""
+def component_key(component: Component, speed_factor: float) -> str:
+    parameters = [
+        ANALYSIS_CACHE_VERSION,
+        component._scheduler.name,
+        component._budget,
+        component._period,
+        speed_factor,
+        [[task._wcet, task._period, task._deadline, task._priority] for task in component.children],
+    ]
+
+    #   json writes floats with repr, so equal parameters always give the same text
+    return hashlib.sha256(json.dumps(parameters).encode()).hexdigest()
+
+
+"""
+    Results of analysis.analyse_component stored in a SQLite database, so they
+    are shared by later runs and by concurrent ones. Each result remembers when
+    it was last used, and the least recently used ones are removed once there
+    are more than `size`.
+
+    The cache only speeds the analysis up: if the database can't be used, a
+    warning is printed and every lookup misses.
+"""
+class AnalysisCache:
+
+    def __init__(self, file_name: str = ANALYSIS_CACHE_FILE, size: int = ANALYSIS_CACHE_SIZE):
+        self._size = size
+        self._connection: Optional[sqlite3.Connection] = None
+
+        try:
+            os.makedirs(os.path.dirname(file_name), exist_ok=True)
+
+            self._connection = sqlite3.connect(file_name, timeout=30)
+            with self._connection:
+                self._connection.execute("CREATE TABLE IF NOT EXISTS results "
+                                         "(key TEXT PRIMARY KEY, result TEXT NOT NULL, last_used REAL NOT NULL)")
+                self._connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+        except (sqlite3.Error, OSError) as e:
+            self._disable(e)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _disable(self, error: Exception):
+        print(f"Warning: analysis cache disabled ({error}).")
+        self.close()
+
+    """
+        Looks the keys up and marks the results found as recently used.
+
+        >   Return:
+            -   Dictionary with the result (schedulable, schedulable tasks) of
+                every key found
+    """
+    def get_many(self, keys: List[str]) -> Dict[str, Tuple[bool, List[bool]]]:
+        results = {}
+
+        if self._connection is None:
+            return results
+
+        try:
+            with self._connection:
+                for start in range(0, len(keys), _QUERY_SIZE):
+                    chunk = keys[start:start + _QUERY_SIZE]
+                    placeholders = ",".join("?" * len(chunk))
+
+                    rows = self._connection.execute(
+                        f"SELECT key, result FROM results WHERE key IN ({placeholders})", chunk)
+                    for key, result in rows:
+                        schedulable, schedulable_tasks = json.loads(result)
+                        results[key] = (schedulable, schedulable_tasks)
+
+                self._connection.executemany("UPDATE results SET last_used = ? WHERE key = ?",
+                                             [(time.time(), key) for key in results])
+
+        except sqlite3.Error as e:
+            self._disable(e)
+            return {}
+
+        return results
+
+    """
+        Stores the results (schedulable, schedulable tasks) of the keys and
+        removes the least recently used results beyond the size of the cache.
+    """
+    def put_many(self, results: Iterable[Tuple[str, Tuple[bool, List[bool]]]]):
+        if self._connection is None:
+            return
+
+        now = time.time()
+        rows = [(key, json.dumps([bool(schedulable), [bool(task) for task in schedulable_tasks]]), now)
+                for key, (schedulable, schedulable_tasks) in results]
+
+        try:
+            with self._connection:
+                self._connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", rows)
+                self._connection.execute("DELETE FROM results WHERE key IN (SELECT key FROM results "
+                                         "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self._size,))
+
+        except sqlite3.Error as e:
+            self._disable(e)
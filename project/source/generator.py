@@ -0,0 +1,151 @@
+import csv
+import math
+import os
+import random
+
+from typing import List
+
+
+#   ------------------------------------------------------------------------------------
+#   Synthetic task set generation
+#   ------------------------------------------------------------------------------------
+
+#   Supported period distributions
+PERIOD_DISTRIBUTIONS = ("loguniform", "uniform", "harmonic")
+
+
+"""
+    UUniFast algorithm (Bini & Buttazzo): splits a total utilization into n
+    utilizations drawn uniformly from the simplex that sums up to it.
+"""
+def uunifast(n: int, total_utilization: float, rng: random.Random) -> List[float]:
+    utilizations = []
+    remaining = total_utilization
+
+    for i in range(1, n):
+        next_remaining = remaining * rng.random() ** (1.0 / (n - i))
+        utilizations.append(remaining - next_remaining)
+        remaining = next_remaining
+
+    utilizations.append(remaining)
+    return utilizations
+
+
+"""
+    Draws n integer periods in [period_min, period_max] following the given distribution:
+        - loguniform: uniform in log scale (as many short as long periods per decade)
+        - uniform: uniform integers
+        - harmonic: period_min multiplied by a random power of two
+"""
+def generate_periods(n: int, period_min: int, period_max: int, distribution: str,
+                     rng: random.Random) -> List[int]:
+    if distribution == "loguniform":
+        return [int(round(math.exp(rng.uniform(math.log(period_min), math.log(period_max)))))
+                for _ in range(n)]
+    elif distribution == "uniform":
+        return [rng.randint(period_min, period_max) for _ in range(n)]
+    elif distribution == "harmonic":
+        max_power = max(0, int(math.log2(period_max / period_min)))
+        return [period_min * 2 ** rng.randint(0, max_power) for _ in range(n)]
+
+    raise ValueError(f"Unknown period distribution '{distribution}', "
+                     f"expected one of {', '.join(PERIOD_DISTRIBUTIONS)}")
+
+
+"""
+    Rate monotonic priority of each period (0 for the shortest one).
+"""
+def rate_monotonic_priorities(periods: List[int]) -> List[int]:
+    priorities = [0] * len(periods)
+
+    for priority, i in enumerate(sorted(range(len(periods)), key=lambda i: periods[i])):
+        priorities[i] = priority
+
+    return priorities
+
+
+"""
+    Generates a hierarchical system model and writes it as architecture.csv, budgets.csv and
+    tasks.csv inside output_folder, in the format read by project_lib.load_model.
+
+    Each core gets `core_utilization` split with UUniFast among its components (their budget
+    over period). Inside a component, the tasks' utilization (after the core speed factor is
+    applied) is `task_load` times the component's, split again with UUniFast. Component
+    periods are a fraction of the shortest task period, so the BDR delay stays small.
+    RM priorities follow the periods (0 is the highest priority).
+"""
+def generate_system(output_folder: str, cores: int, components_per_core: int, tasks_per_component: int,
+                    core_utilization: float = 0.7, task_load: float = 0.5,
+                    period_min: int = 10, period_max: int = 1000,
+                    period_distribution: str = "loguniform", seed: int = 0):
+    rng = random.Random(seed)
+    os.makedirs(output_folder, exist_ok=True)
+
+    architecture = []
+    budgets = []
+    tasks = []
+
+    for core_index in range(cores):
+        core_id = f"Core_{core_index + 1}"
+        speed_factor = round(rng.uniform(0.5, 1.0), 2)
+        architecture.append([core_id, speed_factor, rng.choice(["EDF", "RM"])])
+
+        component_utilizations = uunifast(components_per_core, core_utilization, rng)
+
+        for component_index, component_utilization in enumerate(component_utilizations):
+            component_id = f"{core_id}_Component_{component_index + 1}"
+            scheduler = rng.choice(["EDF", "RM"])
+
+            periods = generate_periods(tasks_per_component, period_min, period_max,
+                                       period_distribution, rng)
+            component_period = max(2.0, round(min(periods) * rng.uniform(0.25, 0.5), 2))
+            budget = round(component_utilization * component_period, 4)
+            budgets.append([component_id, scheduler, budget, component_period, core_id,
+                            component_index])
+
+            task_utilizations = uunifast(tasks_per_component, component_utilization * task_load, rng)
+            priorities = rate_monotonic_priorities(periods)
+
+            for task_index, (period, task_utilization) in enumerate(zip(periods, task_utilizations)):
+                #   WCETs in tasks.csv are nominal, the analysis divides them by the speed factor
+                wcet = max(0.001, round(task_utilization * period * speed_factor, 4))
+                priority = priorities[task_index] if scheduler == "RM" else ""
+                tasks.append([f"Task_{len(tasks)}", wcet, period, component_id, priority])
+
+    _write_csv(os.path.join(output_folder, "architecture.csv"),
+               ["core_id", "speed_factor", "scheduler"], architecture)
+    _write_csv(os.path.join(output_folder, "budgets.csv"),
+               ["component_id", "scheduler", "budget", "period", "core_id", "priority"], budgets)
+    _write_csv(os.path.join(output_folder, "tasks.csv"),
+               ["task_name", "wcet", "period", "component_id", "priority"], tasks)
+
+
+"""
+    Generates a flat task set in the format of the exercise tasksets
+    (Task,BCET,WCET,Period,Deadline,Priority) and writes it to file_name. Times are
+    integers so the task set can also be simulated with a time unit of 1. Priorities
+    are rate monotonic (0 is the highest priority) and deadlines are implicit.
+"""
+def generate_taskset(file_name: str, tasks: int, utilization: float = 0.7,
+                     period_min: int = 10, period_max: int = 1000,
+                     period_distribution: str = "loguniform", seed: int = 0):
+    rng = random.Random(seed)
+
+    periods = generate_periods(tasks, period_min, period_max, period_distribution, rng)
+    utilizations = uunifast(tasks, utilization, rng)
+    priorities = rate_monotonic_priorities(periods)
+
+    rows = []
+    for i, (period, task_utilization) in enumerate(zip(periods, utilizations)):
+        wcet = max(1, int(round(task_utilization * period)))
+        bcet = rng.randint(0, wcet)
+        rows.append([f"Task_{i}", bcet, wcet, period, period, priorities[i]])
+
+    _write_csv(file_name, ["Task", "BCET", "WCET", "Period", "Deadline", "Priority"], rows)
+
+
+def _write_csv(file_name: str, header: List[str], rows: List[list]):
+    with open(file_name, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
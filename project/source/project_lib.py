@@ -1,7 +1,12 @@
-import pandas as pd
+import csv
+import gc
+import hashlib
+import math
 import os
+import pickle
 
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence
 from enum import Enum, auto
 
 #   ------------------------------------------------------------------------------------
@@ -15,6 +20,9 @@ class Scheduler(Enum):
 #   Core class 
 #   ------------------------------------------------------------------------------------
 class Core:
+
+    __slots__ = ('_core_id', '_speed_factor', '_scheduler', 'root_comp')
+
     def __init__(self, identifier: str, speed_factor: float, scheduler: str):
         try:
             self._core_id = identifier
@@ -44,17 +52,28 @@ class Core:
             utilization += component._budget / component._period
         
         #   Check if the utilization is less than the limit for scheduler
+        return utilization <= self.utilization_bound()
+
+    """
+        Utilization bound of the core's scheduler for its children components
+        (Liu & Layland bound for RM, 1 for EDF).
+    """
+    def utilization_bound(self):
         if self._scheduler == Scheduler.RM:
             n = len(self.root_comp.children)
-            return utilization <= n*(2**(1/n) - 1)
+            return n*(2**(1/n) - 1)
         elif self._scheduler == Scheduler.EDF:
-            return utilization <= 1.0
+            return 1.0
 
             
 #   ------------------------------------------------------------------------------------
 #   Component
 #   ------------------------------------------------------------------------------------
 class Component:
+
+    __slots__ = ('_component_id', '_core_id', '_scheduler', '_budget', '_period', '_interface',
+                 '_required_supply', '_provided_supply', '_parent', 'children', '_priority')
+
     def __init__(self, component_id: str, scheduler: str, budget: float, 
                  period: float, core_id: str, priority: int = -1):
 
@@ -112,16 +131,32 @@ class Component:
         child._parent = self
 
     """
-    Returns whether a component is a leaf or not (i.e. is terminal). Only works for simulator.
+    Returns whether a component is a leaf or not (i.e. is terminal): it has no subcomponents, only tasks.
     """
     def is_leaf(self):
-        return not self.children
+        return not any(isinstance(child, Component) for child in self.children)
+
+    """
+    Returns the children of the component that are components
+    """
+    def subcomponents(self):
+        return [child for child in self.children if isinstance(child, Component)]
+
+    """
+    Returns the children of the component that are tasks
+    """
+    def tasks(self):
+        return [child for child in self.children if isinstance(child, Task)]
 
             
 #   ------------------------------------------------------------------------------------
 #   Task 
 #   ------------------------------------------------------------------------------------
 class Task:
+
+    __slots__ = ('_id', '_wcet', '_period', '_deadline', '_component_id', '_priority',
+                 '_schedulable', '_wcrt', '_parent')
+
     def __init__(self, id: str, wcet: float, period: int, component_id: str, priority: int = -1):
         try:
             assert  type(id) == str and \
@@ -143,6 +178,9 @@ class Task:
             #   Initialize it as -1 since this will be calculated by the simulator
             self._wcrt = -1
 
+            #   Component the task is added to
+            self._parent = None
+
         except AssertionError:
             print("Error: Given parameters (Task) \
                   didn't meet the requirements for instance.")
@@ -152,7 +190,9 @@ class Task:
 #   Resource Paradigm employed in HSS (only BDR model is valid)
 #   ------------------------------------------------------------------------------------
 class Resource_paradigm:
-    
+
+    __slots__ = ('_model', '_av_factor', '_part_delay')
+
     def __init__(self,parameters,model="BDR"):
         try:
             #   Model definition:
@@ -179,118 +219,287 @@ class Resource_paradigm:
 
 
 #   ------------------------------------------------------------------------------------
-#   Global Resources for Simulator and Analysis Tool execution
+#   System model for Simulator and Analysis Tool execution
 #   ------------------------------------------------------------------------------------
 
-# Global variable for cores
-cores_registry: Dict[str, Core] = {}
-#Global variable for components
-components_registry: Dict[str, Component] = {}
-# Global variable for tasks
-tasks_registry: Dict[str, Task] = {}
-# Registry of Tasks associated with Component for terminal Components
-component_task_registry: Dict[str, List[Task]] = {}
+"""
+Cores, components and tasks of a system, organized in an hierarchical structure: the root component of
+each core has the core's components as children, and each component has its tasks as children. The
+registries are read-only once the model is built, so several models (e.g. of different input folders)
+can be held in the same process without mixing them.
+"""
+class SystemModel:
+
+    __slots__ = ('cores', 'components', 'tasks', 'component_tasks')
+
+    def __init__(self, cores: Dict[str, Core], components: Dict[str, Component], tasks: Dict[str, Task]):
+        #   Registries of cores, components and tasks by their ID, in the order of the csv files. They
+        #   are copied, so changes to the given dictionaries don't show through the read-only views
+        self.cores: Mapping[str, Core] = MappingProxyType(dict(cores))
+        self.components: Mapping[str, Component] = MappingProxyType(dict(components))
+        self.tasks: Mapping[str, Task] = MappingProxyType(dict(tasks))
+
+        #   Tasks of each component
+        self.component_tasks: Mapping[str, Sequence[Task]] = MappingProxyType(
+            {component_id: tuple(component.tasks()) for component_id, component in components.items()})
 
-#Global time value for simulator usage
-CURRENT_TIME = 0.0
+    #   The read-only registries can't be pickled, so the model is rebuilt from copies of them
+    def __reduce__(self):
+        return (SystemModel, (dict(self.cores), dict(self.components), dict(self.tasks)))
 
 #   ------------------------------------------------------------------------------------
 #   Library functions
 #   ------------------------------------------------------------------------------------
 
+#   Columns of each input file, with the ones holding numbers
+CSV_COLUMNS = {
+    "architecture.csv": (("core_id", "speed_factor", "scheduler"), ("speed_factor",)),
+    "budgets.csv": (("component_id", "scheduler", "budget", "period", "core_id", "priority"),
+                    ("budget", "period", "priority")),
+    "tasks.csv": (("task_name", "wcet", "period", "component_id", "priority"),
+                  ("wcet", "period", "priority")),
+}
+
 """
-Initializes cores
+Reads an input csv file column by column with the csv module (pandas is not needed). Numeric columns are
+converted in bulk the way pandas.read_csv types them: int if every value is an integer, float otherwise, with
+NaN for empty values. Raises ValueError if a column is missing or holds a value that isn't a number.
 """
-def initialize_cores(df: pd.DataFrame):
+def read_csv_columns(file_name: str) -> Dict[str, list]:
+    columns, numeric_columns = CSV_COLUMNS[os.path.basename(file_name)]
+
+    with open(file_name, newline="") as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        rows = [row for row in reader if row]
 
-    for index, row in df.iterrows():
-        core = Core(
-            row["core_id"],
-            row["speed_factor"],
-            row["scheduler"]
-        )
+    missing = [name for name in columns if name not in header]
+    if missing:
+        raise ValueError(f"{file_name}: missing column(s) {', '.join(missing)}")
 
-        cores_registry[core._core_id] = core
+    data = {}
+    for name in columns:
+        index = header.index(name)
+        values = [row[index].strip() if index < len(row) else "" for row in rows]
+        data[name] = _numeric_column(file_name, name, values) if name in numeric_columns else values
+
+    return data
 
 """
-Initializes components and adds them to hierarchy structure
+Converts the values of a numeric column to int, or to float if any of them isn't an integer or is empty.
 """
-def initialize_components(df: pd.DataFrame):
-
-    for index, row in df.iterrows():
-        component = Component(
-            row["component_id"],
-            row["scheduler"],
-            float(row["budget"]),
-            float(row["period"]),
-            row["core_id"],
-            row["priority"]
-        )
-
-        core = cores_registry.get(component._core_id)
-        core.root_comp.add_child(component)
+def _numeric_column(file_name: str, name: str, values: List[str]) -> list:
+    try:
+        if all(values) and all(value.lstrip("+-").isdigit() for value in values):
+            return [int(value) for value in values]
+
+        return [float(value) if value else math.nan for value in values]
+
+    except ValueError:
+        row = next(i for i, value in enumerate(values) if value and not _is_number(value))
+        raise ValueError(f"{file_name}: column '{name}' has the non-numeric value "
+                         f"'{values[row]}' in row {row + 1}") from None
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+"""
+Returns the columns of a pandas DataFrame (or an already column-wise mapping) as lists of plain Python values.
+"""
+def _columns(data) -> Mapping[str, Sequence]:
+    if hasattr(data, "to_dict"):
+        return {name: data[name].tolist() for name in data.columns}
+
+    return data
+
+"""
+Initializes cores from the columns of architecture.csv (or a DataFrame with them)
 
-        components_registry[component._component_id] = component
+>   Return:
+    -   Dictionary of the cores by their ID
+"""
+def initialize_cores(data) -> Dict[str, Core]:
+    data = _columns(data)
+    cores = {}
+
+    for core_id, speed_factor, scheduler in zip(data["core_id"], data["speed_factor"], data["scheduler"]):
+        core = Core(core_id, speed_factor, scheduler)
+
+        cores[core._core_id] = core
+
+    return cores
 
 """
-Initializes tasks and adds them to hierarchy structure
+Initializes components from the columns of budgets.csv (or a DataFrame with them) and adds them to hierarchy
+structure, as children of the root component of their core
+
+>   Return:
+    -   Dictionary of the components by their ID
 """
-def initialize_tasks(df: pd.DataFrame):
+def initialize_components(data, cores: Dict[str, Core]) -> Dict[str, Component]:
+    data = _columns(data)
+    components = {}
+
+    for component_id, scheduler, budget, period, core_id, priority in zip(
+            data["component_id"], data["scheduler"], data["budget"], data["period"], data["core_id"],
+            data["priority"]):
+        component = Component(component_id, scheduler, float(budget), float(period), core_id, priority)
+
+        core = cores.get(component._core_id)
+        core.root_comp.add_child(component)
+
+        components[component._component_id] = component
+
+    return components
 
-    for index, row in df.iterrows():
-        component = components_registry.get(row["component_id"])
-        core = cores_registry.get(component._core_id)
-        wcet = float(row["wcet"]/core._speed_factor)
+"""
+Initializes tasks from the columns of tasks.csv (or a DataFrame with them) and adds them to hierarchy structure,
+as children of their component
+
+>   Return:
+    -   Dictionary of the tasks by their ID
+"""
+def initialize_tasks(data, cores: Dict[str, Core], components: Dict[str, Component]) -> Dict[str, Task]:
+    data = _columns(data)
+    tasks = {}
+
+    for task_name, wcet, period, component_id, priority in zip(
+            data["task_name"], data["wcet"], data["period"], data["component_id"], data["priority"]):
+        component = components.get(component_id)
+        core = cores.get(component._core_id)
+        wcet = float(wcet/core._speed_factor)
         
         if component._scheduler == Scheduler.RM:
-            task = Task(
-                row["task_name"],
-                wcet,
-                row["period"],
-                row["component_id"],
-                row["priority"]
-            )
+            task = Task(task_name, wcet, period, component_id, priority)
         else:   #   EDF
-            task = Task(
-                row["task_name"],
-                wcet,
-                row["period"],
-                row["component_id"]
-            )
+            task = Task(task_name, wcet, period, component_id)
 
-        tasks_registry[task._id] = task
+        tasks[task._id] = task
 
-        component_task_registry.setdefault(task._component_id, []).append(task)
+        component.add_child(task)
+
+    return tasks
         
 
+#   ------------------------------------------------------------------------------------
+#   Model snapshots
+#   ------------------------------------------------------------------------------------
+
+#   Folder of the binary snapshots of loaded models, and how many of them are kept
+MODEL_CACHE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "models")
+MODEL_CACHE_SIZE = 16
+
+#   Part of the snapshot key, must be changed whenever the model classes or the loader change
+SNAPSHOT_VERSION = 2
+
 """
-Only works under the assumption that both the input folder is named 'input' and the files inside
-will be named architecture.csv, budgets.csv and tasks.csv, following the nomenclature on the test
-cases given by the teacher. When function has finished executing, all objects from csv data are created, 
-added to global resources and organized in an hierarchical structure.
+Key of the snapshot of an input folder: hash of the contents of its csv files (and the snapshot version),
+so a snapshot is never used after any of the files changes.
 """
-def initialize_csv_data():
+def snapshot_key(input_folder: str) -> str:
+    digest = hashlib.sha256(f"snapshot-v{SNAPSHOT_VERSION}".encode())
 
-    # Get the directory where the Python script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    for file_name in CSV_COLUMNS:
+        with open(os.path.join(input_folder, file_name), "rb") as f:
+            content = f.read()
 
-    # Construct the full path to the file
-    input_folder = os.path.join(script_dir, "../input")
+        digest.update(f"{file_name}:{len(content)}:".encode())
+        digest.update(content)
 
-    initialize_cores(pd.read_csv(os.path.join(input_folder, "architecture.csv")))
+    return digest.hexdigest()
 
-    initialize_components(pd.read_csv(os.path.join(input_folder, "budgets.csv")))
+"""
+Reads the model of the snapshot file.
 
-    initialize_tasks(pd.read_csv(os.path.join(input_folder, "tasks.csv")))
+>   Return:
+    -   The SystemModel, or None if there is no usable snapshot
+"""
+def load_snapshot(file_name: str) -> Optional[SystemModel]:
+    #   The garbage collector would otherwise run over and over while the objects are created
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        with open(file_name, "rb") as f:
+            model = pickle.load(f)
+    except Exception:
+        #   Missing, truncated or written by an incompatible version, it is rebuilt from the csv files
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return model if isinstance(model, SystemModel) else None
 
 """
-Adds the Task as children to the components. Since the Simulator uses different classes from the Task to build its tree
-this needs to be separate.
+Writes the model to the snapshot file, and removes the least recently used snapshots beyond
+MODEL_CACHE_SIZE. A model that can't be written is simply not cached.
+"""
+def save_snapshot(model: SystemModel, file_name: str):
+    try:
+        folder = os.path.dirname(file_name)
+        os.makedirs(folder, exist_ok=True)
+
+        #   Written to a temporary file first, so concurrent runs never read half a snapshot
+        temporary_file = f"{file_name}.{os.getpid()}.tmp"
+        with open(temporary_file, "wb") as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, file_name)
+
+        snapshots = sorted((entry for entry in os.scandir(folder) if entry.name.endswith(".pickle")),
+                           key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in snapshots[MODEL_CACHE_SIZE:]:
+            os.remove(entry.path)
+
+    except OSError as e:
+        print(f"Warning: model snapshot couldn't be written ({e}).")
+
+"""
+Loads the model from the input folder, which must contain the files architecture.csv, budgets.csv
+and tasks.csv, following the nomenclature on the test cases given by the teacher. If no folder is
+given, the 'input' folder of the project is used. The objects from csv data are created and organized
+in an hierarchical structure, which is used by both the Simulator and the Analysis Tool.
+
+The built model is saved as a binary snapshot keyed by the contents of the csv files, and later loads of
+the same files read the snapshot instead of parsing them (unless use_cache is False).
+
+>   Return:
+    -   The SystemModel
 """
-def initialize_analysis_data():
-    initialize_csv_data()
+def load_model(input_folder: str = None, use_cache: bool = True) -> SystemModel:
+
+    if input_folder is None:
+        # Get the directory where the Python script is located
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+
+        # Construct the full path to the file
+        input_folder = os.path.join(script_dir, "../input")
+
+    if use_cache:
+        snapshot_file = os.path.join(MODEL_CACHE_FOLDER, f"{snapshot_key(input_folder)}.pickle")
+
+        model = load_snapshot(snapshot_file)
+        if model is not None:
+            #   Mark it as recently used
+            try:
+                os.utime(snapshot_file)
+            except OSError:
+                pass
+            return model
+
+    cores = initialize_cores(read_csv_columns(os.path.join(input_folder, "architecture.csv")))
+
+    components = initialize_components(read_csv_columns(os.path.join(input_folder, "budgets.csv")), cores)
+
+    tasks = initialize_tasks(read_csv_columns(os.path.join(input_folder, "tasks.csv")), cores, components)
+
+    model = SystemModel(cores, components, tasks)
 
-    for task in tasks_registry.values():
-        component = components_registry.get(task._component_id)
+    if use_cache:
+        save_snapshot(model, snapshot_file)
 
-        component.add_child(task)
\ No newline at end of file
+    return model
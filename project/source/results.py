@@ -0,0 +1,167 @@
+import csv
+import json
+import math
+import os
+import sqlite3
+
+from typing import List, Mapping, Sequence
+
+
+#   ------------------------------------------------------------------------------------
+#   Results output
+#   ------------------------------------------------------------------------------------
+
+#   Supported output formats and the extension of their files
+RESULT_FORMATS = {
+    "csv": ".csv",
+    "jsonl": ".jsonl",
+    "parquet": ".parquet",
+    "sqlite": ".sqlite",
+}
+
+
+"""
+    Name of the results file in the given format: file_name with the extension
+    of the format.
+"""
+def results_file(file_name: str, results_format: str) -> str:
+    return os.path.splitext(file_name)[0] + RESULT_FORMATS[results_format]
+
+
+"""
+    Collects result rows (one value per column, None when there is no value)
+    in memory and writes them all at once when closed, replacing any previous
+    results file. Formats:
+        - csv: floats written with float_format (or the format of their column
+          in column_formats) and None as an empty field
+        - jsonl: one JSON object per row, with null for non-finite floats (e.g. an
+          unbounded scaling factor), which JSON can't represent
+        - parquet: a columnar file, only available if pyarrow is installed
+        - sqlite: a table named after the file, indexed by the `index` columns
+
+    Only the csv format rounds values, the others keep the full precision.
+"""
+class ResultsSink:
+
+    def __init__(self, file_name: str, columns: Sequence[str], results_format: str = "csv",
+                 index: Sequence[str] = (), float_format: str = "{:.4f}",
+                 column_formats: Mapping[str, str] = None):
+        if results_format not in RESULT_FORMATS:
+            raise ValueError(f"Unknown results format '{results_format}', "
+                             f"expected one of {', '.join(RESULT_FORMATS)}")
+
+        #   Checked now, so a missing dependency is reported before any work is done
+        if results_format == "parquet":
+            try:
+                import pyarrow    # noqa: F401
+            except ImportError:
+                raise ImportError("The parquet results format needs pyarrow (pip install pyarrow)") from None
+
+        self.file_name = results_file(file_name, results_format)
+        self.columns = tuple(columns)
+        self.results_format = results_format
+        self.index = tuple(index)
+        self.float_format = float_format
+        self.column_formats = dict(column_formats or {})
+        self.rows: List[tuple] = []
+
+    def __enter__(self):
+        return self
+
+    #   Results are only written if every row could be collected
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+
+    """
+        Adds a row with the values of the columns in their order.
+    """
+    def add(self, row: Sequence):
+        assert len(row) == len(self.columns)
+        self.rows.append(tuple(row))
+
+    """
+        Writes every row to the results file.
+    """
+    def close(self):
+        folder = os.path.dirname(self.file_name)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        if self.results_format == "csv":
+            self._write_csv()
+        elif self.results_format == "jsonl":
+            self._write_jsonl()
+        elif self.results_format == "parquet":
+            self._write_parquet()
+        elif self.results_format == "sqlite":
+            self._write_sqlite()
+
+    def _write_csv(self):
+        formats = [self.column_formats.get(name, self.float_format) for name in self.columns]
+
+        with open(self.file_name, "w", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(self.columns)
+            writer.writerows([
+                ["" if value is None else float_format.format(value) if type(value) == float else value
+                 for value, float_format in zip(row, formats)]
+                for row in self.rows])
+
+    def _write_jsonl(self):
+        with open(self.file_name, "w") as f:
+            f.writelines(json.dumps(dict(zip(self.columns, map(_json_value, row))), allow_nan=False) + "\n"
+                         for row in self.rows)
+
+    def _write_parquet(self):
+        import pyarrow
+        import pyarrow.parquet
+
+        columns = list(zip(*self.rows)) if self.rows else [()] * len(self.columns)
+        table = pyarrow.table({name: list(values) for name, values in zip(self.columns, columns)})
+
+        pyarrow.parquet.write_table(table, self.file_name)
+
+    def _write_sqlite(self):
+        table = os.path.splitext(os.path.basename(self.file_name))[0]
+        columns = ", ".join(f'"{name}" {_sqlite_type(self.rows, i)}' for i, name in enumerate(self.columns))
+        placeholders = ", ".join("?" * len(self.columns))
+
+        connection = sqlite3.connect(self.file_name)
+        try:
+            with connection:
+                connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+                connection.execute(f'CREATE TABLE "{table}" ({columns})')
+                connection.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', self.rows)
+
+                for name in self.index:
+                    connection.execute(f'CREATE INDEX "{table}_{name}" ON "{table}" ("{name}")')
+        finally:
+            connection.close()
+
+
+"""
+    Value written to a JSON Lines file: None (null) instead of inf and nan.
+"""
+def _json_value(value):
+    if type(value) == float and not math.isfinite(value):
+        return None
+    return value
+
+
+"""
+    SQLite type of a column, from the type of its first value that isn't None.
+"""
+def _sqlite_type(rows: List[tuple], column: int) -> str:
+    for row in rows:
+        value = row[column]
+
+        if value is None:
+            continue
+        if isinstance(value, (bool, int)):
+            return "INTEGER"
+        if isinstance(value, float):
+            return "REAL"
+        return "TEXT"
+
+    return "TEXT"
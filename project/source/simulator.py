@@ -2,14 +2,15 @@ from source.project_lib import *
 import heapq
 import sys
 import math
+import os
 
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum, auto
-from typing import List, Optional, Callable, Any
-from source.project_lib import (Core, Component, Task, cores_registry, 
-                         tasks_registry, components_registry, CURRENT_TIME)
+from typing import List, Optional, Callable, Any, Sequence
+from source.project_lib import Core, Component, Task, SystemModel
+from source.stats import ResponseTimeStats
 
 # --- Simulation Constants ---
-SIMULATION_END_TIME = 0.0  
 EPSILON = 1e-9              # For floating point comparisons
 
 #   --------------------
@@ -32,36 +33,59 @@ class EventType(Enum):
 
 class TaskExecution:
 
-    def __init__(self, task: Task):
+    __slots__ = ('id', 'wcet', 'absolute_deadline', 'period', 'priority', 'component_id',
+                 'component_index', 'scheduler', 'schedulable', 'state', 'queue_sequence',
+                 'arrival_time', 'exec_time', 'exec_count', 'response_stats', 'deadlines_met',
+                 'deadlines_missed', 'priority_key')
+
+    def __init__(self, task: Task, component: 'ComponentState', release_time: float = 0.0,
+                 response_stats: Optional[ResponseTimeStats] = None):
         self.id = task._id
         self.wcet = task._wcet
-        self.absolute_deadline = CURRENT_TIME + task._deadline
+        self.absolute_deadline = release_time + task._deadline
         self.period = task._period
+        self.priority = task._priority
         self.component_id = task._component_id
+        self.component_index = component.index
+        self.scheduler = component.scheduler
         self.schedulable = True
         
         self.state = TaskState.IDLE
-        self.arrival_time = CURRENT_TIME
+        #   Sequence number of the ready queue entry currently holding this task (None when the
+        #   task is not queued). Entries with any other number are tombstones.
+        self.queue_sequence = None
+        self.arrival_time = release_time
         self.exec_time = self.wcet
         self.exec_count = 0
-        self.completion_times = []
-        self.response_times = []
+        #   Response times of the completed jobs (the full trace is only kept if requested)
+        self.response_stats = response_stats if response_stats is not None else ResponseTimeStats()
         self.deadlines_met = 0
         self.deadlines_missed = 0
+        self.update_priority_key()
+
+    """
+        Precomputes the key used to order the current job in its component's ready queue:
+        the period (RM) or absolute deadline (EDF), with ties broken by the task priority (a
+        number). Remaining ties are broken by the ready queue in insertion order. Preemption
+        only compares the first element (see make_scheduling_decision). Must be called
+        whenever a new job is released.
+    """
+    def update_priority_key(self):
+        if self.scheduler == Scheduler.RM:
+            self.priority_key = (self.period, self.priority)
+        else:
+            self.priority_key = (self.absolute_deadline, self.priority)
 
     def __lt__(self, other):
         #   ATTENTION: You should only compare two tasks that belong to the same component
         #   (i.e, that have the same scheduler) or else this logic is wrong
-        component = components_registry.get(self.component_id)
-
-        if component._scheduler == Scheduler.RM:
-            return self.period < other.period
-        elif component._scheduler == Scheduler.EDF:
-            return self.absolute_deadline < other.absolute_deadline
+        return self.priority_key < other.priority_key
 
 
 class Event:
 
+    __slots__ = ('time', 'type', 'data')
+
     def __init__(self, time: float, event_type: EventType, data: Any):
         self.time = time
         self.type = event_type
@@ -70,510 +94,758 @@ class Event:
     def __lt__(self, other):
         return self.time < other.time
 
-#   ------------------------------------------------------------------------------------
-#   Global variables
-#   ------------------------------------------------------------------------------------
+"""
+    Ready queue of a terminal Component. Entries are (priority_key, sequence, task) tuples, so
+    the heap only compares plain tuples and never TaskExecution objects. Removing a task only
+    invalidates its entry (the task's queue_sequence stops matching it), and invalid entries
+    are discarded once they reach the top of the heap.
+"""
+class ReadyQueue:
+
+    __slots__ = ('heap', 'size', 'sequence')
+
+    def __init__(self):
+        self.heap = []
+        #   Number of valid entries
+        self.size = 0
+        self.sequence = 0
+
+    def __len__(self):
+        return self.size
+
+    """
+        Adds a task to the queue.
+    """
+    def push(self, task_exec: TaskExecution):
+        self.sequence += 1
+        task_exec.queue_sequence = self.sequence
+        heapq.heappush(self.heap, (task_exec.priority_key, self.sequence, task_exec))
+        self.size += 1
+
+    """
+        Removes a task from the queue, if it is queued.
+    """
+    def remove(self, task_exec: TaskExecution):
+        if task_exec.queue_sequence is not None:
+            task_exec.queue_sequence = None
+            self.size -= 1
+
+            #   Rebuild the heap once tombstones dominate it
+            if len(self.heap) > 2 * self.size + 8:
+                self.heap = [entry for entry in self.heap if entry[2].queue_sequence == entry[1]]
+                heapq.heapify(self.heap)
+
+    """
+        Gets the highest priority task without removing it.
+    """
+    def peek(self) -> Optional[TaskExecution]:
+        while self.heap:
+            _, sequence, task_exec = self.heap[0]
+            if task_exec.queue_sequence == sequence:
+                return task_exec
+            heapq.heappop(self.heap)
+
+        return None
+
+    """
+        Removes and returns the highest priority task.
+    """
+    def pop(self) -> Optional[TaskExecution]:
+        task_exec = self.peek()
+
+        if task_exec is not None:
+            heapq.heappop(self.heap)
+            task_exec.queue_sequence = None
+            self.size -= 1
+
+        return task_exec
+
+
+"""
+    Min-heap of the children of a component that currently have an eligible leaf below them
+    (i.e. ready work and available budget), ordered by the parent's scheduling key and then
+    by the child's position. Removals and key changes are lazy: the heap may hold outdated
+    entries, which are discarded once they reach the top, and it is rebuilt when outdated
+    entries outnumber the valid ones.
+"""
+class EligibleChildren:
+
+    __slots__ = ('children', 'heap', 'keys')
+
+    def __init__(self, children: List['ComponentState']):
+        self.children = children
+        #   Heap of (key, position) entries
+        self.heap = []
+        #   Current key of every eligible child, by position
+        self.keys: Dict[int, float] = {}
+
+    def __bool__(self):
+        return bool(self.keys)
+
+    """
+        Sets the key of the child at the given position, or removes it when key is None.
+    """
+    def update(self, position: int, key: Optional[float]):
+        if key is None:
+            self.keys.pop(position, None)
+        elif self.keys.get(position) != key:
+            self.keys[position] = key
+            heapq.heappush(self.heap, (key, position))
+
+        if len(self.heap) > 2 * len(self.keys) + 8:
+            self.heap = [(key, position) for position, key in self.keys.items()]
+            heapq.heapify(self.heap)
+
+    """
+        Returns the eligible child with the highest priority, or None if there is none.
+    """
+    def top(self) -> Optional['ComponentState']:
+        while self.heap:
+            key, position = self.heap[0]
+            if self.keys.get(position) == key:
+                return self.children[position]
+            heapq.heappop(self.heap)
+
+        return None
+
+
+"""
+    Runtime state of a Component during a simulation run: its current budget, next replenish
+    time, ready queue (terminal components) or priority index (other components). Kept apart
+    from the Component itself so the loaded model is never modified by a simulation.
+"""
+class ComponentState:
+
+    __slots__ = ('component', 'component_id', 'index', 'position', 'scheduler', 'budget', 'period',
+                 'parent', 'children', 'current_budget', 'next_replenish_time', 'ready_queue',
+                 'eligible', 'eligible_children')
+
+    def __init__(self, component: Component, index: int, parent: Optional['ComponentState'],
+                 position: int):
+        self.component = component
+        self.component_id = component._component_id
+        #   Index in the engine's list of components and position among its siblings
+        self.index = index
+        self.position = position
+        self.scheduler = component._scheduler
+        self.budget = component._budget
+        self.period = component._period
+        self.parent = parent
+        self.children: List[ComponentState] = []
+        self.current_budget = component._budget
+        self.next_replenish_time = component._period
+        self.ready_queue: Optional[ReadyQueue] = None
+        #   Whether there is an eligible leaf in this subtree and, for non-leaf components, the
+        #   heap of eligible children
+        self.eligible = False
+        self.eligible_children: Optional[EligibleChildren] = None
+
+    def is_leaf(self):
+        return not self.children
 
-#   Queue holding the events for simulation. This is a priority queue (min-heap based on event.time)
-event_queue: List[Event] = []
-#   Registry of Tasks associated with Component for terminal Components
-component_task_exec_registry: Dict[str, List[TaskExecution]] = {}
-#   The queue of ready tasks for each terminal Component
-ready_queues: Dict[str, List[TaskExecution]] = {}
-#   The root core
-core: Core = None
-#   The TaskExecution currently running.
-running_task: Optional[TaskExecution] = None
 
 #  --------------------------------------------------------------------------------------
 #  Helper Functions
 #  --------------------------------------------------------------------------------------
 
 """
-    Gets the highest priority component, with a non-empty ready queue.
-"""
-def get_highest_priority_component() -> Component:
-    def traverse(node: Component):
-        nonlocal result
-        priority_attr = None
-
-        #   Decides which property should be evaluated based on scheduler 
-        if node._scheduler == Scheduler.RM:
-            priority_attr = '_period'
-        elif node._scheduler == Scheduler.EDF:
-            priority_attr = 'next_replenish_time'
-
-        if priority_attr is None:
-            print(f"Error: Target component '{node._component_id}' has an uncovered scheduler.")
-            return
-        
-        #   If it's a leaf node
-        if node.is_leaf():
-            #   Check if it meets the conditions to be picked
-            if ((ready_queues.get(node._component_id) or \
-            (running_task is not None and running_task.component_id == node._component_id)) and \
-            get_node_available_resources(node) > 0.0):
-
-                result = node
-            return
-            
-        #   Find child with highest priority
-        next_node = min(node.children, key=lambda x: getattr(x, priority_attr))
-        traverse(next_node)
-        
-        #   If we didn't find a valid leaf in that branch, try other children
-        if result is None:
-            for child in sorted(node.children, key=lambda x: getattr(x, priority_attr)):
-                #   Already checked this one
-                if child != next_node:
-                    traverse(child)
-                    if result is not None:
-                        break
-        
-    result = None
-    traverse(core.root_comp)
-    return result 
-
-
-"""
-    Adds a task to a component's ready queue.
+    Iterates through the component tree hierarchy downwards, applying an operation on every node.
 """
-def add_to_component_ready_queue(component: Component, task_exec: TaskExecution):
-    heapq.heappush(ready_queues.get(component._component_id), task_exec)
+def apply_action_on_tree(node: Component, action: Callable[[Component], None]):
+    action(node)
+    
+    for child in node.children:
+        apply_action_on_tree(child, action)
 
 
 """
-    Removes an element from a component's ready queue.
+    Iterates through the component tree hierarchy, finding the node that fits the condition.
+    The condition is given as a callable that returns bool to allow more complex checks.
 """
-def remove_from_component_ready_queue(component: Component, task_exec: TaskExecution):
-    ready_queue = ready_queues.get(component._component_id)
+def filter_tree_node(node: Component, action: Callable[[Component], bool]) -> Component:
+    if action(node):
+        return node
+    else:
+        for child in node.children:
+            filter_tree_node(child, action)
 
-    if ready_queue:
-        ready_queue.remove(task_exec)
-        #   This is necessary because removing an arbitrary task from the ready_queue breaks
-        #   the heapify and needs to be redone.
-        heapq.heapify(ready_queue)
 
+#   ------------------------------------------------------------------------------------
+#   Simulation engine
+#   ------------------------------------------------------------------------------------
 
 """
-    Gets the highest priority task from the ready queue without removing it.
-"""
-def peek_highest_priority_ready_task(ready_queue: List[TaskExecution]) -> Optional[TaskExecution]:
-    if ready_queue:
-        #   Peek at the smallest element (highest priority)
-        return ready_queue[0]
-    return None
+    Holds the whole state of the simulation of one core, so that several simulations can
+    run in the same process (or in parallel worker processes) without sharing state.
+"""
+class SimulationEngine:
+
+    def __init__(self, core: Core, max_sim_time: float, quantiles: Sequence[float] = (),
+                 keep_trace: bool = False):
+        self.target_core_id = core._core_id
+        self.end_time = max_sim_time
+        self.current_time = 0.0
+
+        #   Response time quantiles estimated for every task, and whether the full trace of
+        #   response times is kept
+        self.quantiles = tuple(quantiles)
+        self.keep_trace = keep_trace
+
+        #   Queue holding the events for simulation. This is a priority queue (min-heap based
+        #   on event.time)
+        self.event_queue: List[Event] = []
+        #   Registry of Tasks associated with Component for terminal Components
+        self.component_task_exec_registry: Dict[str, List[TaskExecution]] = {}
+        #   The root core
+        self.core: Core = core
+        #   Runtime state of every Component of the core, indexed by ComponentState.index
+        #   (the root is the first one)
+        self.components: List[ComponentState] = []
+        self.root: ComponentState = None
+        #   The TaskExecution currently running.
+        self._running_task: Optional[TaskExecution] = None
+
+    """
+        The TaskExecution currently running. Changing it updates the priority index of the
+        components of both the previous and the new running task.
+    """
+    @property
+    def running_task(self) -> Optional[TaskExecution]:
+        return self._running_task
+
+    @running_task.setter
+    def running_task(self, task_exec: Optional[TaskExecution]):
+        previous = self._running_task
+        self._running_task = task_exec
+
+        if previous is not None and previous is not task_exec:
+            self.update_priority_index(self.components[previous.component_index])
+        if task_exec is not None:
+            self.update_priority_index(self.components[task_exec.component_index])
+
+    #  ----------------------------------------------------------------------------------
+    #  Helper Functions
+    #  ----------------------------------------------------------------------------------
+
+    """
+        Gets the highest priority component, with a non-empty ready queue (or the running task)
+        and available resources. Follows the highest priority eligible child from the root down
+        to a leaf, using the priority index.
+    """
+    def get_highest_priority_component(self) -> ComponentState:
+        node = self.root
+
+        if not node.eligible:
+            return None
+
+        while not node.is_leaf():
+            node = node.eligible_children.top()
 
+        return node
 
-"""
-    Removes and returns the highest priority task from the ready queue.
-"""
-def pop_highest_priority_ready_task(ready_queue: List[TaskExecution]) -> Optional[TaskExecution]:
-     if ready_queue:
-        task = heapq.heappop(ready_queue)
-        return task
-     return None
 
+    """
+        Scheduling key of a component among its siblings, according to its parent's scheduler.
+    """
+    def get_priority_key(self, node: ComponentState) -> Optional[float]:
+        if node.parent.scheduler == Scheduler.RM:
+            return node.period
+        elif node.parent.scheduler == Scheduler.EDF:
+            return node.next_replenish_time
+
+        print(f"Error: Target component '{node.parent.component_id}' has an uncovered scheduler.")
+        return None
+
+
+    """
+        Recomputes whether a component has an eligible leaf and updates its entry in the
+        parent's priority index, going up the hierarchy while the eligibility changes. Must be
+        called whenever a component's ready queue, budget or replenish time changes, or when
+        the running task changes.
+    """
+    def update_priority_index(self, node: ComponentState):
+        while node is not None:
+            if node.is_leaf():
+                has_work = bool(node.ready_queue) or \
+                    (self._running_task is not None and self._running_task.component_index == node.index)
+            else:
+                has_work = bool(node.eligible_children)
 
-"""
-    Adds an event to the event queue.
-"""
-def schedule_event(event: Event):
-    if event.time < SIMULATION_END_TIME:
-        heapq.heappush(event_queue, event)
+            if node is self.root:
+                node.eligible = has_work
+                return
 
+            eligible = has_work and node.current_budget > 0.0
+            changed = eligible != node.eligible
+            node.eligible = eligible
 
-"""
-    Peeks at the next event on the event queue.
-"""
-def peek_next_event() -> Optional[Event]:
-    if event_queue:
-        return event_queue[0]
-    
-    return None
+            key = self.get_priority_key(node) if eligible else None
+            node.parent.eligible_children.update(node.position, key)
 
+            #   The parent only needs updating if this component appeared or disappeared from its
+            #   index (key changes are already handled by the heap)
+            if not changed:
+                return
 
-"""
-    Removes and returns the next event from the event queue.
-"""
-def get_next_event() -> Optional[Event]:
-    if event_queue:
-        return heapq.heappop(event_queue)
-    
-    return None
+            node = node.parent
 
 
-"""
-    Iterates through the component tree hierarchy downwards, applying an operation on every node.
-"""
-def apply_action_on_tree(node: Component, action: Callable[[Component], None]):
-    action(node)
-    
-    for child in node.children:
-        apply_action_on_tree(child, action)
+    """
+        Creates the runtime state of a component and its subcomponents.
+    """
+    def initialize_component_state(self, component: Component, parent: Optional[ComponentState] = None,
+                                   position: int = 0) -> ComponentState:
+        state = ComponentState(component, len(self.components), parent, position)
+        self.components.append(state)
 
+        for child_position, child in enumerate(component.subcomponents()):
+            state.children.append(self.initialize_component_state(child, state, child_position))
 
-"""
-    Calculates the available resources for a node and returns it.
-"""
-def get_node_available_resources(node: Component) -> float:
-    def traverse(node: Component):
-        nonlocal result
+        if state.is_leaf():
+            state.ready_queue = ReadyQueue()
+        else:
+            state.eligible_children = EligibleChildren(state.children)
 
-        if node == core.root_comp:
-            return
-        
-        #   Gets the lowest possible budget value in the tree, by checking the budget
-        #   available from parents
-        if node.current_budget < result:
-            result = node.current_budget
+        return state
 
-        traverse(node._parent)
 
-    result = sys.float_info.max
-    traverse(node)
-    return result
+    """
+        Adds a task to a component's ready queue.
+    """
+    def add_to_component_ready_queue(self, component: ComponentState, task_exec: TaskExecution):
+        component.ready_queue.push(task_exec)
+        self.update_priority_index(component)
 
 
-"""
-    Iterates through the component tree hierarchy, finding the node that fits the condition.
-    The condition is given as a callable that returns bool to allow more complex checks.
-"""
-def filter_tree_node(node: Component, action: Callable[[Component], bool]) -> Component:
-    if action(node):
-        return node
-    else:
-        for child in node.children:
-            filter_tree_node(child, action)
+    """
+        Removes an element from a component's ready queue.
+    """
+    def remove_from_component_ready_queue(self, component: ComponentState, task_exec: TaskExecution):
+        if component.ready_queue:
+            component.ready_queue.remove(task_exec)
+            self.update_priority_index(component)
 
 
-"""
-    Sets up the TaskExecution objects in the registry for simulator execution.
-"""
-def initialize_taskexecs_registry(component: Component):
-    #   Check if the component has tasks as children
-    if component.is_leaf():
+    """
+        Adds an event to the event queue.
+    """
+    def schedule_event(self, event: Event):
+        if event.time < self.end_time:
+            heapq.heappush(self.event_queue, event)
 
-        component_tasks = component_task_registry.get(component._component_id)
 
-        component_taskexecs = []
+    """
+        Peeks at the next event on the event queue.
+    """
+    def peek_next_event(self) -> Optional[Event]:
+        if self.event_queue:
+            return self.event_queue[0]
+        
+        return None
 
-        for task in component_tasks:
-            task_exec = TaskExecution(task)
-            component_taskexecs.append(task_exec)
 
-            #   Schedule the task arrival event
-            schedule_event(Event(0.0, EventType.TASK_ARRIVAL, task_exec))
+    """
+        Removes and returns the next event from the event queue.
+    """
+    def get_next_event(self) -> Optional[Event]:
+        if self.event_queue:
+            return heapq.heappop(self.event_queue)
+        
+        return None
 
-        component_task_exec_registry[component._component_id] = component_taskexecs
 
+    """
+        Calculates the available resources for a node and returns it.
+    """
+    def get_node_available_resources(self, node: ComponentState) -> float:
+        result = sys.float_info.max
 
-"""
-    Initializes the ready queue for a component, heapifying it.
-"""
-def initialize_ready_queue(component: Component):
-    #   Check if the component has tasks as children
-    if component.is_leaf():
-        ready_queue = []
-        heapq.heapify(ready_queue)
+        #   Gets the lowest possible budget value in the tree, by checking the budget
+        #   available from parents
+        while node is not self.root:
+            if node.current_budget < result:
+                result = node.current_budget
 
-        ready_queues[component._component_id] = ready_queue
+            node = node.parent
 
+        return result
 
-"""
-    Sets initial budget and schedules initial event for budget replenish.
-"""
-def set_initial_remaining_budgets(component: Component):
 
-    component.current_budget = component._budget
-    component.next_replenish_time = component._period
+    """
+        Sets up the TaskExecution objects in the registry for simulator execution.
+    """
+    def initialize_taskexecs_registry(self, component: ComponentState):
+        #   Check if the component has tasks as children
+        if component.is_leaf():
 
-    if (component != core.root_comp):
-        schedule_event(Event(component._period, EventType.BUDGET_REPLENISH, component))
+            component_tasks = component.component.tasks()
 
+            component_taskexecs = []
 
-"""
-    Reduces a component's current budget and its respective parent component's budget
-    by a given value.
-"""
-def reduce_current_hierarchy_budget(component: Component, value: float):
+            for task in component_tasks:
+                task_exec = TaskExecution(task, component, self.current_time,
+                                          ResponseTimeStats(self.quantiles, self.keep_trace))
+                component_taskexecs.append(task_exec)
 
-    if component != core.root_comp:
-        component.current_budget -= value
-        reduce_current_hierarchy_budget(component._parent, value)
+                #   Schedule the task arrival event
+                self.schedule_event(Event(0.0, EventType.TASK_ARRIVAL, task_exec))
 
+            self.component_task_exec_registry[component.component_id] = component_taskexecs
 
-# -----------------------------
-# --- Core Simulation Logic ---
-# -----------------------------
 
-"""
-    Executes the RM simulation loop for the specified core.
-"""
-def run_simulation(target_core_id: str, maxSimTime: float):
-    global CURRENT_TIME, SIMULATION_END_TIME, running_task
+    """
+        Sets initial budget and schedules initial event for budget replenish.
+    """
+    def set_initial_remaining_budgets(self, component: ComponentState):
 
-    SIMULATION_END_TIME = maxSimTime
+        component.current_budget = component.budget
+        component.next_replenish_time = component.period
 
-    if not initialize_simulation_state(target_core_id):
-        return
+        if (component is not self.root):
+            self.schedule_event(Event(component.period, EventType.BUDGET_REPLENISH, component))
 
-    print("\n--- Starting RM Simulation Loop ---")
-    while event_queue and CURRENT_TIME < maxSimTime:
-        next_event = peek_next_event()
-        time_to_next_event = next_event.time
 
-        if time_to_next_event > CURRENT_TIME:
-            elapsed_time = time_to_next_event - CURRENT_TIME
+    """
+        Reduces a component's current budget and its respective parent component's budget
+        by a given value.
+    """
+    def reduce_current_hierarchy_budget(self, component: ComponentState, value: float):
 
-            while not math.isclose(elapsed_time, 0.0):
+        if component is not self.root:
+            component.current_budget -= value
+            self.reduce_current_hierarchy_budget(component.parent, value)
+            self.update_priority_index(component)
 
-                if running_task is None:
-                    # If no task is running, it means there is no budget. Since the only event that can be
-                    # triggered by process_idle_time is a task completion, which should not affect the budget,
-                    # we can confidently move to the next event, as we consider the remaining elapsed_time
-                    # as idle time
-                    CURRENT_TIME += elapsed_time
-                    break
-                elif event_queue and time_to_next_event != peek_next_event().time:
-                    # If a task completion event was scheduled, we should break this processing and let the event
-                    # run.
-                    break
-                
-                #Represents the exact time that was processed
-                execution_slice = process_idle_time(elapsed_time)
 
-                CURRENT_TIME += execution_slice
-                elapsed_time -= execution_slice
+    # -----------------------------
+    # --- Core Simulation Logic ---
+    # -----------------------------
 
-                make_scheduling_decision()
+    """
+        Executes the RM simulation loop for the target core. Returns False if the
+        simulation could not be started.
+    """
+    def run(self) -> bool:
+        if not self.initialize_simulation_state():
+            return False
 
-        next_event = get_next_event()
-        #ensure exact sync of current_time
-        CURRENT_TIME = next_event.time
-        handle_event(next_event)
+        print("\n--- Starting RM Simulation Loop ---")
+        while self.event_queue and self.current_time < self.end_time:
+            next_event = self.peek_next_event()
+            time_to_next_event = next_event.time
 
-        make_scheduling_decision()
+            if time_to_next_event > self.current_time:
+                elapsed_time = time_to_next_event - self.current_time
 
-    CURRENT_TIME = min(CURRENT_TIME, SIMULATION_END_TIME)
-    #Final statistics calculation/display happens outside this function
+                while not math.isclose(elapsed_time, 0.0):
 
+                    if self.running_task is None:
+                        # If no task is running, it means there is no budget. Since the only event that can be
+                        # triggered by process_idle_time is a task completion, which should not affect the budget,
+                        # we can confidently move to the next event, as we consider the remaining elapsed_time
+                        # as idle time
+                        self.current_time += elapsed_time
+                        break
+                    elif self.event_queue and time_to_next_event != self.peek_next_event().time:
+                        # If a task completion event was scheduled, we should break this processing and let the event
+                        # run.
+                        break
+                    
+                    #Represents the exact time that was processed
+                    execution_slice = self.process_idle_time(elapsed_time)
 
-"""
-    Prepares tasks and schedules initial events for the target core.
-"""
-def initialize_simulation_state(target_core_id: str):
-    global CURRENT_TIME, running_task, core
-    
-    #   Reset variables
-    CURRENT_TIME = 0.0
-    event_queue.clear()
-    component_task_exec_registry.clear()
-    ready_queues.clear()
-    running_task = None
-
-    #   Heapify event_queue
-    heapq.heapify(event_queue)
-
-    #   Find the target core and setup root node information
-    if target_core_id not in cores_registry:
-        print(f"Error: Target core '{target_core_id}' not found in loaded cores.")
-        return False
-    
-    core = cores_registry[target_core_id]
+                    self.current_time += execution_slice
+                    elapsed_time -= execution_slice
 
-    #   Setup component task execution registry. This also initializes TaskExecution objects and
-    #   their respective task_arrival events, as the simulator has synchronous start
-    apply_action_on_tree(core.root_comp, initialize_taskexecs_registry)
-    
-    #   Setup component ready queues
-    apply_action_on_tree(core.root_comp, initialize_ready_queue)
+                    self.make_scheduling_decision()
 
-    #   Set component initial remaining budgets
-    apply_action_on_tree(core.root_comp, set_initial_remaining_budgets)  
+            next_event = self.get_next_event()
+            #ensure exact sync of current_time
+            self.current_time = next_event.time
+            self.handle_event(next_event)
 
-    print("Simulation state initialized.")
-    return True
+            self.make_scheduling_decision()
 
+        self.current_time = min(self.current_time, self.end_time)
+        #Final statistics calculation/display happens outside this function
+        return True
 
-"""
-    Processes the passed time between current time and what should be the next event. Returns
-    the actual time slice that could be executed safely.
-"""
-def process_idle_time(max_slice_duration: float) -> float:
-    global CURRENT_TIME, running_task
 
-    if running_task is None:
-        return 0.0
-    
-    #   Temporary variable so we can change current time for processing idle without changing 
-    #   the global variable. This is done because CURRENT_TIME is updated on the main simulation
-    #   loop and should not be updated here. The reason is because new events might pop up in
-    #   this idle time processing, and the CURRENT_TIME after being changed here would be incorrect.
-    #   Although it would be updated to the correct value when the event is popped out of the queue
-    #   back on the main loop, we should avoid any unecessary changes to the variable that might
-    #   lead to bugs and incorrect results.
-    current_time = CURRENT_TIME
+    """
+        Prepares tasks and schedules initial events for the target core.
+    """
+    def initialize_simulation_state(self) -> bool:
+        #   Reset variables
+        self.current_time = 0.0
+        self.event_queue.clear()
+        self.component_task_exec_registry.clear()
+        self.components.clear()
+        self._running_task = None
 
-    #   Get component to which current running task belongs
-    component = components_registry.get(running_task.component_id)
+        #   Heapify event_queue
+        heapq.heapify(self.event_queue)
 
-    available_budget = get_node_available_resources(component)
+        #   Setup the runtime state of the components, including their ready queues and priority
+        #   index. Nothing is eligible yet, as ready queues are still empty
+        self.root = self.initialize_component_state(self.core.root_comp)
 
-    #   Get the lowest budget in the running component hierarchy. This tells us how much available
-    #   resources we have to run the task
-    execution_slice = min(running_task.exec_time, available_budget, max_slice_duration)
+        #   Setup component task execution registry. This also initializes TaskExecution objects and
+        #   their respective task_arrival events, as the simulator has synchronous start
+        apply_action_on_tree(self.root, self.initialize_taskexecs_registry)
 
-    #   Update task and component based on the available execution_slice
-    running_task.exec_time -= execution_slice
-    reduce_current_hierarchy_budget(component, execution_slice)
+        #   Set component initial remaining budgets
+        apply_action_on_tree(self.root, self.set_initial_remaining_budgets)  
 
-    #   Update current time
-    current_time += execution_slice
+        print("Simulation state initialized.")
+        return True
 
-    if math.isclose(running_task.exec_time, 0.0) or running_task.exec_time < 0.0:
 
-        schedule_event(Event(current_time, EventType.TASK_COMPLETION, running_task))
+    """
+        Processes the passed time between current time and what should be the next event. Returns
+        the actual time slice that could be executed safely.
+    """
+    def process_idle_time(self, max_slice_duration: float) -> float:
+        if self.running_task is None:
+            return 0.0
+        
+        #   Local variable so we can change current time for processing idle without changing 
+        #   the engine's current_time. This is done because current_time is updated on the main
+        #   simulation loop and should not be updated here. The reason is because new events might
+        #   pop up in this idle time processing, and the current_time after being changed here would
+        #   be incorrect. Although it would be updated to the correct value when the event is popped
+        #   out of the queue back on the main loop, we should avoid any unecessary changes to the
+        #   variable that might lead to bugs and incorrect results.
+        current_time = self.current_time
 
-        running_task = None
+        #   Get component to which current running task belongs
+        component = self.components[self.running_task.component_index]
 
-    elif math.isclose(available_budget - execution_slice, 0.0) or \
-    available_budget - execution_slice < 0.0:
-        running_task.state = TaskState.READY
-        add_to_component_ready_queue(component, running_task)
-        
-        running_task = None
+        available_budget = self.get_node_available_resources(component)
 
-    return execution_slice
+        #   Get the lowest budget in the running component hierarchy. This tells us how much available
+        #   resources we have to run the task
+        execution_slice = min(self.running_task.exec_time, available_budget, max_slice_duration)
 
+        #   Update task and component based on the available execution_slice
+        self.running_task.exec_time -= execution_slice
+        self.reduce_current_hierarchy_budget(component, execution_slice)
 
+        #   Update current time
+        current_time += execution_slice
 
-"""
-    Handles the current event from the event queue.
-"""
-def handle_event(event: Event):
-    if event.type == EventType.BUDGET_REPLENISH:
-        handle_budget_replenish(event)
-    elif event.type == EventType.TASK_ARRIVAL:
-        handle_task_arrival(event)
-    elif event.type == EventType.TASK_COMPLETION:
-        handle_task_completion(event)
+        if math.isclose(self.running_task.exec_time, 0.0) or self.running_task.exec_time < 0.0:
 
+            self.schedule_event(Event(current_time, EventType.TASK_COMPLETION, self.running_task))
 
-"""
-    Decides which task should be running at current time, according to schedulers and priorities.
-"""
-def make_scheduling_decision():
-    global running_task, CURRENT_TIME
+            self.running_task = None
 
-    highest_ready = None
-    component = get_highest_priority_component()
+        elif math.isclose(available_budget - execution_slice, 0.0) or \
+        available_budget - execution_slice < 0.0:
+            self.running_task.state = TaskState.READY
+            self.add_to_component_ready_queue(component, self.running_task)
+            
+            self.running_task = None
+
+        return execution_slice
+
+
+
+    """
+        Handles the current event from the event queue.
+    """
+    def handle_event(self, event: Event):
+        if event.type == EventType.BUDGET_REPLENISH:
+            self.handle_budget_replenish(event)
+        elif event.type == EventType.TASK_ARRIVAL:
+            self.handle_task_arrival(event)
+        elif event.type == EventType.TASK_COMPLETION:
+            self.handle_task_completion(event)
+
+
+    """
+        Decides which task should be running at current time, according to schedulers and priorities.
+    """
+    def make_scheduling_decision(self):
+        highest_ready = None
+        component = self.get_highest_priority_component()
+
+        if component is not None:
+            ready_queue = component.ready_queue
+
+            highest_ready = ready_queue.peek()
+
+        if self.running_task is None and highest_ready:
+            #   Start the highest priority ready task
+            self.running_task = ready_queue.pop()
+            self.running_task.state = TaskState.RUNNING
+        else: #     A task is currently running
+            #   Within a component only a strictly shorter period (RM) or earlier deadline (EDF)
+            #   preempts, the tie-breaks of the priority key only order the ready queue
+            if (highest_ready and \
+            (component.index != self.running_task.component_index or \
+            (component.index == self.running_task.component_index and \
+             highest_ready.priority_key[0] < self.running_task.priority_key[0]))):
+
+                #   Stop the running task and put it back in the ready queue
+                preempted_task = self.running_task
+                preempted_task.state = TaskState.READY
+                self.add_to_component_ready_queue(self.components[preempted_task.component_index],
+                                                  preempted_task)
+
+                #   Start the new highest priority task
+                self.running_task = ready_queue.pop()
+                self.running_task.state = TaskState.RUNNING
+
+
+    """
+        Handles Component budget being replenished event.
+    """
+    def handle_budget_replenish(self, event: Event):
+        try:
+            assert type(event.data) == ComponentState
+            event.data.current_budget = event.data.budget
+            event.data.next_replenish_time = self.current_time + event.data.period
+            self.update_priority_index(event.data)
+
+            self.schedule_event(Event(event.data.next_replenish_time, EventType.BUDGET_REPLENISH,
+                                      event.data))
+        except AssertionError:
+                print("Error: Event data was not of type ComponentState as expected")
+        pass
+        
 
-    if component is not None:
-        ready_queue = ready_queues.get(component._component_id)
+    """
+        Handles a task arrival event.
+    """
+    def handle_task_arrival(self, event: Event):
+        assert type(event.data) == TaskExecution 
+        task = event.data
+        component = self.components[task.component_index]
+
+        if task.state != TaskState.IDLE:
+            #   Deadline miss detection for the previous job
+            task.deadlines_missed += 1
+            task.schedulable = False
+
+            # --- Abort Policy ---
+            #   Approach: Abort it to prioritize the new job.
+
+            if task.state == TaskState.RUNNING:
+                #   If the overrunning job was the one currently running
+                if self.running_task and self.running_task.id == task.id:
+                    print(f"    Aborting currently RUNNING job of Task {task.id}.")
+                    self.running_task = None # Make the core available
+                    #   Note: The task object itself still exists, but it's no longer tracked as running.
+                    #   We will reset its state below when the new job starts.
+                else:
+                    print(f" Task detected as running is not actually running_task TASK_ID: {task.id}")
+            elif task.state == TaskState.READY:
+                print(f"    Removing From ready queue TASK {task.id}.")
+                #   If the overrunning job was preempted and in the ready queue
+                self.remove_from_component_ready_queue(component, task) # Remove the old instance
+
+            #   Task state will be reset to READY for the new job below.
+
+        # --- Activate the NEW job ---
+        task.state = TaskState.READY
+        task.arrival_time = event.time
+        task.exec_time = task.wcet
+
+        #   New job gets its own deadline. Under assumption period = deadline.
+        task.absolute_deadline = event.time + task.period
+        task.update_priority_key()
+        task.exec_count += 1
+
+        #   Add the NEW job instance to the ready queue
+        self.add_to_component_ready_queue(component, task)
+
+        #   Schedule the NEXT arrival of this task
+        self.schedule_event(Event(event.time + task.period, EventType.TASK_ARRIVAL, task))
+        
 
-        highest_ready = peek_highest_priority_ready_task(ready_queue)
+    """
+        Handles a task completion event.
+    """
+    def handle_task_completion(self, event: Event):
+        assert type(event.data) == TaskExecution 
+        task = event.data
 
-    if running_task is None and highest_ready:
-        #   Start the highest priority ready task
-        running_task = pop_highest_priority_ready_task(ready_queue)
-        running_task.state = TaskState.RUNNING
-    else: #     A task is currently running
-        if (highest_ready and \
-        (component._component_id != running_task.component_id or \
-        (component._component_id == running_task.component_id and highest_ready < running_task))):
+        task.state = TaskState.IDLE
+        response_time = event.time - task.arrival_time
+        task.response_stats.add(response_time, event.time)
+        task.deadlines_met += 1
 
-            #   Stop the running task and put it back in the ready queue
-            preempted_task = running_task
-            preempted_task.state = TaskState.READY
-            add_to_component_ready_queue(components_registry.get(preempted_task.component_id),
-                                         preempted_task)
+        if self.running_task == task:
+            self.running_task = None # Core becomes free
 
-            #   Start the new highest priority task
-            running_task = pop_highest_priority_ready_task(ready_queue)
-            running_task.state = TaskState.RUNNING
 
+#   ------------------------------------------------------------------------------------
+#   Simulation drivers
+#   ------------------------------------------------------------------------------------
 
 """
-    Handles Component budget being replenished event.
-"""
-def handle_budget_replenish(event: Event):
-    try:
-        assert type(event.data) == Component
-        #   Dynamic variables to avoid changing original Component class
-        event.data.current_budget = event.data._budget
-        event.data.next_replenish_time = CURRENT_TIME + event.data._period
-
-        schedule_event(Event(event.data.next_replenish_time, EventType.BUDGET_REPLENISH, event.data))
-    except AssertionError:
-            print("Error: Event data was not of type Component as expected")
-    pass
-    
+    Runs the simulation of the specified core and returns the engine holding its final
+    state, or None if the simulation could not be started.
 
+    >   Parameters:
+        - quantiles: response time quantiles to estimate for every task (e.g. 0.99)
+        - keep_trace: keep every (completion time, response time) pair of every task
 """
-    Handles a task arrival event.
-"""
-def handle_task_arrival(event: Event):
-    global running_task
-
-    assert type(event.data) == TaskExecution 
-    task = event.data
-    component = components_registry.get(task.component_id)
-
-    if task.state != TaskState.IDLE:
-        #   Deadline miss detection for the previous job
-        task.deadlines_missed += 1
-        task.schedulable = False
-
-        # --- Abort Policy ---
-        #   Approach: Abort it to prioritize the new job.
-
-        if task.state == TaskState.RUNNING:
-            #   If the overrunning job was the one currently running
-            if running_task and running_task.id == task.id:
-                print(f"    Aborting currently RUNNING job of Task {task.id}.")
-                running_task = None # Make the core available
-                #   Note: The task object itself still exists, but it's no longer tracked as running.
-                #   We will reset its state below when the new job starts.
-            else:
-                print(f" Task detected as running is not actually running_task TASK_ID: {task.id}")
-        elif task.state == TaskState.READY:
-            print(f"    Removing From ready queue TASK {task.id}.")
-            #   If the overrunning job was preempted and in the ready queue
-            remove_from_component_ready_queue(component, task) # Remove the old instance
+def run_simulation(core: Core, maxSimTime: float, quantiles: Sequence[float] = (),
+                   keep_trace: bool = False) -> Optional[SimulationEngine]:
+    engine = SimulationEngine(core, maxSimTime, quantiles, keep_trace)
+
+    if not engine.run():
+        return None
 
-        #   Task state will be reset to READY for the new job below.
+    return engine
 
-    # --- Activate the NEW job ---
-    task.state = TaskState.READY
-    task.arrival_time = event.time
-    task.exec_time = task.wcet
 
-    #   New job gets its own deadline. Under assumption period = deadline.
-    task.absolute_deadline = event.time + task.period
-    task.exec_count += 1
+"""
+    Simulates a single core and returns its TaskExecution registry. Used as the worker
+    function of the parallel driver, which sends each worker the core (with its components
+    and tasks) it simulates.
+"""
+def simulate_core(core: Core, maxSimTime: float, quantiles: Sequence[float] = (),
+                  keep_trace: bool = False) -> Dict[str, List[TaskExecution]]:
+    engine = run_simulation(core, maxSimTime, quantiles, keep_trace)
 
-    #   Add the NEW job instance to the ready queue
-    add_to_component_ready_queue(component, task)
+    if engine is None:
+        return {}
+
+    return engine.component_task_exec_registry
 
-    #   Schedule the NEXT arrival of this task
-    schedule_event(Event(event.time + task.period, EventType.TASK_ARRIVAL, task))
-    
 
 """
-    Handles a task completion event.
+    Simulates every core of the model, each one in a separate worker process, and merges the
+    TaskExecution registries of all cores (in the model's order).
+
+    >   Parameters:
+        - model: SystemModel to simulate
+        - maxSimTime: simulation time
+        - workers: maximum number of worker processes. With 1 the cores are simulated
+        serially in this process, with None one process per core is used (limited by
+        the number of CPUs).
+        - quantiles, keep_trace: see run_simulation
 """
-def handle_task_completion(event: Event):
-    global running_task
+def run_parallel_simulation(model: SystemModel, maxSimTime: float, workers: Optional[int] = None,
+                            quantiles: Sequence[float] = (), keep_trace: bool = False) \
+        -> Dict[str, List[TaskExecution]]:
+    cores = list(model.cores.values())
+    task_exec_registry: Dict[str, List[TaskExecution]] = {}
+
+    if workers == 1:
+        results = [simulate_core(core, maxSimTime, quantiles, keep_trace) for core in cores]
+    else:
+        if workers is None:
+            workers = min(len(cores), os.cpu_count() or 1)
 
-    assert type(event.data) == TaskExecution 
-    task = event.data
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [executor.submit(simulate_core, core, maxSimTime, quantiles, keep_trace)
+                       for core in cores]
+            results = [future.result() for future in futures]
 
-    task.state = TaskState.IDLE
-    response_time = event.time - task.arrival_time
-    task.completion_times.append(event.time)
-    task.response_times.append(response_time)
-    task.deadlines_met += 1
+    for core_registry in results:
+        task_exec_registry.update(core_registry)
 
-    if running_task == task:
-        running_task = None # Core becomes free
\ No newline at end of file
+    return task_exec_registry
@@ -0,0 +1,167 @@
+import math
+
+from bisect import insort
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+#   ------------------------------------------------------------------------------------
+#   P-square quantile estimator
+#   ------------------------------------------------------------------------------------
+
+"""
+    Fixed-memory estimator of a single quantile, using the P-square algorithm
+    (Jain & Chlamtac, 1985). It keeps five markers whose heights approximate the
+    minimum, p/2, p, (1+p)/2 quantiles and the maximum of the observations, adjusted
+    with a piecewise-parabolic formula as new observations arrive.
+"""
+class P2Quantile:
+
+    __slots__ = ('p', 'count', 'heights', 'positions', 'desired', 'increments')
+
+    def __init__(self, p: float):
+        assert 0.0 < p < 1.0
+        self.p = p
+        self.count = 0
+        #   Marker heights, actual positions, desired positions and desired position increments
+        self.heights: List[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1.0, 1.0 + 2*p, 1.0 + 4*p, 3.0 + 2*p, 5.0]
+        self.increments = [0.0, p/2, p, (1.0 + p)/2, 1.0]
+
+    """
+        Adds an observation to the estimator.
+    """
+    def add(self, value: float):
+        self.count += 1
+        heights = self.heights
+        positions = self.positions
+
+        #   The first five observations initialize the markers
+        if self.count <= 5:
+            insort(heights, value)
+            return
+
+        #   Find the cell the observation falls in, extending the extreme markers if needed
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        #   Adjust the heights of the middle markers that drifted from their desired position
+        for i in range(1, 4):
+            drift = self.desired[i] - positions[i]
+
+            if (drift >= 1.0 and positions[i + 1] - positions[i] > 1) or \
+               (drift <= -1.0 and positions[i - 1] - positions[i] < -1):
+                step = 1 if drift > 0 else -1
+
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / \
+                             (positions[i + step] - positions[i])
+
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        heights = self.heights
+        positions = self.positions
+
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * \
+            ((positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) /
+             (positions[i + 1] - positions[i]) +
+             (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) /
+             (positions[i] - positions[i - 1]))
+
+    """
+        Current estimate of the quantile, or None if there are no observations.
+    """
+    def value(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+
+        #   With few observations the markers are the sorted observations themselves
+        if self.count <= 5:
+            rank = max(0, math.ceil(self.p * self.count) - 1)
+            return self.heights[rank]
+
+        return self.heights[2]
+
+
+#   ------------------------------------------------------------------------------------
+#   Response time statistics
+#   ------------------------------------------------------------------------------------
+
+"""
+    Streaming statistics of the response times of a task: count, mean, variance
+    (Welford's algorithm), minimum and maximum, plus optional quantile estimators.
+    Memory use is constant unless the full trace of (completion time, response time)
+    pairs is explicitly requested with keep_trace.
+"""
+class ResponseTimeStats:
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max', 'quantiles', 'trace')
+
+    def __init__(self, quantiles: Sequence[float] = (), keep_trace: bool = False):
+        self.count = 0
+        self.mean = 0.0
+        #   Sum of squared differences from the mean
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.quantiles: Dict[float, P2Quantile] = {p: P2Quantile(p) for p in quantiles}
+        self.trace: Optional[List[Tuple[float, float]]] = [] if keep_trace else None
+
+    """
+        Adds the response time of a job that completed at completion_time.
+    """
+    def add(self, response_time: float, completion_time: float = 0.0):
+        self.count += 1
+        delta = response_time - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (response_time - self.mean)
+
+        if response_time < self.min:
+            self.min = response_time
+        if response_time > self.max:
+            self.max = response_time
+
+        for estimator in self.quantiles.values():
+            estimator.add(response_time)
+
+        if self.trace is not None:
+            self.trace.append((completion_time, response_time))
+
+    """
+        Sample variance of the response times (0 with less than two observations).
+    """
+    def variance(self) -> float:
+        if self.count < 2:
+            return 0.0
+
+        return self.m2 / (self.count - 1)
+
+    def std(self) -> float:
+        return math.sqrt(self.variance())
+
+    """
+        Estimate of the p quantile, or None if it isn't tracked or there are no observations.
+    """
+    def quantile(self, p: float) -> Optional[float]:
+        estimator = self.quantiles.get(p)
+
+        if estimator is None:
+            return None
+
+        return estimator.value()